@@ -6,6 +6,17 @@ import igraph as ig
 import numpy as np
 from collections import Counter
 
+from csr_graph import MaskedGraph, liveArgmax
+from degree_attack import degreeAttack
+from ci_attack import CollectiveInfluence, ciAttack
+from kcore_attack import coreAttack
+from spectral_attack import spectralAttack
+from static_attack import STATIC_PREFIXES, staticAttacks
+from betweenness import betweennessTracker, tailOrder
+from batch_attack import batchBetweennessAttack
+from percolation import percolate
+from decremental_components import DecrementalComponents
+
 
 def buildAttackPrefix(centrality, followGiant, update=True):
     """ (str, bool, bool) -> str
@@ -18,6 +29,12 @@ def buildAttackPrefix(centrality, followGiant, update=True):
     'Ran'
     >>> buildAttackPrefix('betweenness', True, False)
     'BtwG'
+    >>> buildAttackPrefix('ci', False, True)
+    'CIU'
+    >>> buildAttackPrefix('coreness', False, True)
+    'CoreU'
+    >>> buildAttackPrefix('pagerank', False, True)
+    'PRU'
     """
     
     if centrality == 'degree':
@@ -26,6 +43,14 @@ def buildAttackPrefix(centrality, followGiant, update=True):
         prefix = 'Btw'
     elif centrality == 'random':
         prefix = 'Ran'
+    elif centrality == 'ci':
+        prefix = 'CI'
+    elif centrality == 'coreness':
+        prefix = 'Core'
+    elif centrality == 'eigenvector':
+        prefix = 'Eig'
+    elif centrality == 'pagerank':
+        prefix = 'PR'
         
     if followGiant:
         prefix += 'G'
@@ -54,16 +79,65 @@ def buildFileName(output_dir, net_name, centrality, followGiant, update=True):
 
     return file_name
 
+def saveBetweennessLog(tracker, output_dir, net_name, mode='a'):
+    """ (object, str, str, str) -> None
+
+    Saves the per-step log of an approximate betweenness tracker (if it
+    keeps one) next to the oi_list, as 'btw_log_<net_name>.txt'. Rows
+    are written with the tracker's 'log_fmt'.
+    """
+
+    if not getattr(tracker, 'log', None):
+        return
+    log_file = os.path.join(output_dir, 'btw_log_' + net_name + '.txt')
+    with open(log_file, mode + 'b') as f:
+        np.savetxt(f, tracker.log, fmt=getattr(tracker, 'log_fmt', '%d %f %f'))
+
+def tailReached(cb, tail, N0):
+    """ (ComponentBetweenness, dict, int) -> bool
+
+    True when the giant component of the graph of the betweenness
+    tracker 'cb' has less nodes than tail['min_gcc'], given in nodes
+    or, if below 1, as a fraction of N0. The size is read from the
+    component bookkeeping of the tracker (cb.giantSize()), so the check
+    does not cost a pass over the graph.
+    """
+
+    min_gcc = tail.get('min_gcc', 0.01)
+    if min_gcc < 1:
+        min_gcc = min_gcc * N0
+    return cb.giantSize() < min_gcc
+
+def finishTail(cb, tail, output_dir, net_name, j):
+    """ (ComponentBetweenness, dict, str, str, int) -> list
+
+    Rest of the removal order after the exact phase, with the policy
+    tail['policy'] of betweenness.tailOrder ('components' by default).
+    The number of exact removals 'j' is saved as
+    'exact_phase_<net_name>.txt'.
+    """
+
+    exact_file = os.path.join(output_dir, 'exact_phase_' + net_name + '.txt')
+    with open(exact_file, 'w') as f:
+        f.write('{}\n'.format(j))
+    return tailOrder(cb, tail.get('policy', 'components'))
+
 def centralityUpdateAttack(graph, data_dir, net_name, 
                            centrality='betweenness', 
                            followGiant=False, saveData=True, 
-                           overwrite=False):
-    """ (iGraph.Graph(), str, str, str, bool, bool) -> list 
+                           overwrite=False, btw_method='component',
+                           btw_params=None, ci_ell=2):
+    """ (iGraph.Graph(), str, str, str, bool, bool, str, dict, int) -> list 
     
     Performs a node attack based on 'centrality' restricted or not to
     the giant component.
     
-    Centralities allowed: 'betweenness', 'degree', 'random'.
+    Centralities allowed: 'betweenness', 'degree', 'random', 'ci'
+    (collective influence CI_ell with ell='ci_ell', see
+    ci_attack.CollectiveInfluence).
+
+    'btw_method' and 'btw_params' select how betweenness is kept up to
+    date, see betweenness.betweennessTracker.
     
     >>> data_dir = '../data'
     >>> net_name = 'net_test'
@@ -88,7 +162,7 @@ def centralityUpdateAttack(graph, data_dir, net_name,
                                     
     """
     
-    if centrality not in ['degree', 'betweenness', 'random']:
+    if centrality not in ['degree', 'betweenness', 'random', 'ci']:
         print('ERROR: centrality "', centrality, '" is not supported')
         return
     
@@ -125,10 +199,9 @@ def centralityUpdateAttack(graph, data_dir, net_name,
         components = g.components(mode='weak')
         g = components.giant()
         
-    ## Save original index as a vertex property
+    ## Original indices are the vertex indices of the masked graph
     N0 = g.vcount()
-    n = N0
-    g.vs['original_index'] = range(n)
+    mg = MaskedGraph.fromIgraph(g)
     
     ## List with the node original indices in removal order
     original_indices = []
@@ -140,64 +213,62 @@ def centralityUpdateAttack(graph, data_dir, net_name,
     sorted_deg = np.zeros((N0,N0), dtype=int)
     sizes_arrs = []
 
+    ## Betweenness is only recomputed where a removal can change it
+    cb = betweennessTracker(mg, btw_method, **(btw_params or {}))
+
+    ## Components are updated only on the pieces that break off
+    dc = DecrementalComponents(mg)
+
+    ## Collective influence is recomputed in the ball of each removal
+    ci = CollectiveInfluence(mg, ci_ell) if centrality == 'ci' else None
+
     j = 0
     while True:
         
-        n = g.vcount()
-        
-        ## Compute components
-        components = g.components(mode='weak')
-        gcc = components.giant()
-        n_gcc = gcc.vcount()
+        n = mg.vcount()
+        n_gcc = dc.giantSize()
 
         if n_gcc < 2:
             break
 
         ## Compute centrality measures
         if followGiant:
-            original_indices_values = gcc.vs['original_index']
-            btw_values = gcc.betweenness(directed=False, nobigint=False)
-            deg_values = gcc.degree()                
+            original_indices_values = dc.giantNodes()
         else:
-            original_indices_values = g.vs['original_index']
-            btw_values = g.betweenness(directed=False, nobigint=False)
-            deg_values = g.degree()
+            original_indices_values = mg.aliveNodes()
+        btw_values = cb.values()
+        deg_values = mg.degree()
 
-        for i in range(len(original_indices_values)):
-            oi = original_indices_values[i]
-            sorted_btw[j][oi] = btw_values[i]
-            sorted_deg[j][oi] = deg_values[i]
+        sorted_btw[j][original_indices_values] = btw_values[original_indices_values]
+        sorted_deg[j][original_indices_values] = deg_values[original_indices_values]
 
         ## Identify node to be removed
         if centrality == 'betweenness':
-            idx = max(enumerate(btw_values), key=lambda x: x[1])[0]
+            original_idx = liveArgmax(mg, btw_values, original_indices_values)
         elif centrality == 'degree':
-            idx = max(enumerate(deg_values), key=lambda x: x[1])[0]
+            original_idx = liveArgmax(mg, deg_values, original_indices_values)
+        elif centrality == 'ci':
+            original_idx = ci.argmax(original_indices_values)
         elif centrality == 'random':
             if followGiant:
-                idx = np.random.randint(n_gcc) 
+                original_idx = int(dc.sampleGiant())
             else:
                 idx = np.random.randint(n) 
+                original_idx = int(original_indices_values[idx])
 
         ## Add index to list
-        if followGiant:
-            original_idx = gcc.vs[idx]['original_index']
-        else:
-            original_idx = g.vs[idx]['original_index']
         original_indices.append(original_idx)
 
         ## Add relative size of giant component to list
         s_gcc_values.append(n_gcc/N0)
         
-        comp_sizes = [len(c) for c in components]
-        counter = Counter(comp_sizes)
-        sizes_arr = np.array(sorted([(s, ns) for s, ns in counter.items()], 
-                                    key=lambda x: x[0], reverse=True), dtype=int)        
-        sizes_arrs.append(sizes_arr)
+        sizes_arrs.append(dc.sizeHistogram())
         
         ## Remove node
-        idx = g.vs()['original_index'].index(original_idx)
-        g.vs[idx].delete()     
+        cb.removeNode(original_idx)
+        dc.removeNode(original_idx)
+        if ci is not None:
+            ci.removeNode(original_idx)
 
         j += 1
 
@@ -208,6 +279,9 @@ def centralityUpdateAttack(graph, data_dir, net_name,
         pickle.dump(sorted_btw, f)
     with bz2.BZ2File(deg_file_name, 'w') as f:
         pickle.dump(sorted_deg, f)
+    saveBetweennessLog(cb, output_dir, net_name, mode='w')
+    if hasattr(cb, 'close'):
+        cb.close()
 
     steps = len(original_indices)
     data_to_file = list(zip(range(steps), original_indices, s_gcc_values))
@@ -254,10 +328,9 @@ def centralityUpdateAttackFast(graph, data_dir, net_name,
         components = g.components(mode='weak')
         g = components.giant()
         
-    ## Save original index as a vertex property
+    ## Original indices are the vertex indices of the masked graph
     N0 = g.vcount()
-    n = N0
-    g.vs['original_index'] = range(n)
+    mg = MaskedGraph.fromIgraph(g)
     
     ## List with the node original indices in removal order
     original_indices = []
@@ -267,46 +340,49 @@ def centralityUpdateAttackFast(graph, data_dir, net_name,
     
     sizes_arrs = []
 
+    if centrality == 'degree':
+        ## Bucket-queue engine plus a single percolation pass
+        original_indices = degreeAttack(mg)
+        perc_data = percolate(g, original_indices, histogram=True)
+        Ngcc_values = perc_data['Ngcc']
+        steps = np.argmax(Ngcc_values < 2) if (Ngcc_values < 2).any() else N0
+        original_indices = original_indices[:steps]
+        s_gcc_values = list(Ngcc_values[:steps]/N0)
+        sizes_arrs = perc_data['sizes'][:steps]
+
     j = 0
-    while True:
+    while centrality != 'degree':
         
-        n = g.vcount()
+        n = mg.vcount()
         
         ## Compute components
-        components = g.components(mode='weak')
-        gcc = components.giant()
-        n_gcc = gcc.vcount()
+        comp_sizes = mg.componentSizes()
+        n_gcc = comp_sizes.max()
 
         if n_gcc < 2:
             break
 
         ## Identify node to be removed
-        if centrality == 'degree':
-            deg_values = g.degree()                
-            #idx = max(enumerate(deg_values), key=lambda x: x[1])[0]
-            idx = np.argmax(deg_values)
-        elif centrality == 'random':
+        if centrality == 'random':
             idx = np.random.randint(n) 
+            original_idx = int(mg.aliveNodes()[idx])
         else:
             print('ERROR')
             return None
 
         ## Add index to list
-        original_idx = g.vs[idx]['original_index']
         original_indices.append(original_idx)
 
         ## Add relative size of giant component to list
         s_gcc_values.append(n_gcc/N0)
         
-        comp_sizes = [len(c) for c in components]
-        counter = Counter(comp_sizes)
+        counter = Counter(comp_sizes.tolist())
         sizes_arr = np.array(sorted([(s, ns) for s, ns in counter.items()], 
                                     key=lambda x: x[0], reverse=True), dtype=int)        
         sizes_arrs.append(sizes_arr)
         
         ## Remove node
-        idx = g.vs()['original_index'].index(original_idx)
-        g.vs[idx].delete()     
+        mg.removeNode(original_idx)
 
         j += 1
 
@@ -320,7 +396,20 @@ def centralityUpdateAttackFast(graph, data_dir, net_name,
     return original_indices
 
 
-def betweennessUpdateAttack(graph, data_dir, net_name, overwrite=False, ignore_existing=True):
+def betweennessUpdateAttack(graph, data_dir, net_name, overwrite=False, ignore_existing=True,
+                            btw_method='component', btw_params=None, tail=None):
+    """ (iGraph.Graph(), str, str, bool, bool, str, dict, dict) -> list
+
+    Adaptive betweenness attack (BtwU). 'btw_method' and 'btw_params'
+    select how betweenness is kept up to date, see
+    betweenness.betweennessTracker.
+
+    If 'tail' is a dict, once the giant component falls below
+    tail['min_gcc'] (see tailReached) the order is completed without
+    recomputing betweenness, following tail['policy'] (see
+    betweenness.tailOrder). The oi_list is still a full permutation and
+    the length of the exact phase goes to 'exact_phase_<net_name>.txt'.
+    """
         
     ## Create output directories if they don't exist
     output_dir = os.path.join(data_dir, 'BtwU') 
@@ -329,10 +418,16 @@ def betweennessUpdateAttack(graph, data_dir, net_name, overwrite=False, ignore_e
 
     output = "oi_list_" + net_name + ".txt"
     output_file = os.path.join(output_dir, output)
+    log_file = os.path.join(output_dir, 'btw_log_' + net_name + '.txt')
     if overwrite:
         if os.path.isfile(output_file):
             print('Removing file "' + output_file)
             os.remove(output_file)
+        if os.path.isfile(log_file):
+            os.remove(log_file)
+        exact_file = os.path.join(output_dir, 'exact_phase_' + net_name + '.txt')
+        if os.path.isfile(exact_file):
+            os.remove(exact_file)
 
     ## Create a copy of graph so as not to modify the original
     g = graph.copy()
@@ -350,10 +445,9 @@ def betweennessUpdateAttack(graph, data_dir, net_name, overwrite=False, ignore_e
         components = g.components(mode='weak')
         g = components.giant()             
 
-    ## Save original index as a vertex property
+    ## Original indices are the vertex indices of the masked graph
     N0 = g.vcount()
-    n = N0
-    g.vs['original_index'] = range(n)
+    mg = MaskedGraph.fromIgraph(g)
     
     ## List with the node original indices in removal order
     original_indices = []
@@ -365,45 +459,89 @@ def betweennessUpdateAttack(graph, data_dir, net_name, overwrite=False, ignore_e
             print('Ignoring file "' + output_file)
             return None
         else:
-            oi_values = np.loadtxt(output_file)
+            oi_values = np.loadtxt(output_file, dtype='int', ndmin=1)
             for oi in oi_values:
-                idx = g.vs['original_index'].index(oi)
-                g.vs[idx].delete()
+                mg.removeNode(oi)
                 original_indices.append(oi)
                 j += 1
     
+    ## Betweenness is only recomputed where a removal can change it
+    cb = betweennessTracker(mg, btw_method, **(btw_params or {}))
+
     with open(output_file, 'a+') as f:
     
         while j < N0:
 
-            ## Compute betweenness
-            btw_values = g.betweenness(directed=False, nobigint=False)
+            if tail is not None and tailReached(cb, tail, N0):
+                for original_idx in finishTail(cb, tail, output_dir, net_name, j):
+                    original_indices.append(original_idx)
+                    f.write('{}\n'.format(original_idx))
+                j = N0
+                break
 
             ## Identify node to be removed
-            idx = max(enumerate(btw_values), key=lambda x: x[1])[0]
+            original_idx = cb.argmax()
 
             ## Add index to list
-            original_idx = g.vs[idx]['original_index']
             original_indices.append(original_idx)
 
             ## Remove node
-            idx = g.vs()['original_index'].index(original_idx)
-            g.vs[idx].delete()     
+            cb.removeNode(original_idx)
 
             j += 1
             
             f.write('{}\n'.format(original_idx))
             f.flush()
 
+    saveBetweennessLog(cb, output_dir, net_name)
+    if hasattr(cb, 'close'):
+        cb.close()
+
     return original_indices
 
-def updateAttack(graph, data_dir, net_name, centrality='degree', overwrite=False, ignore_existing=True):
+def updateAttack(graph, data_dir, net_name, centrality='degree', overwrite=False, ignore_existing=True,
+                 btw_method='component', btw_params=None, btw_batch=None, tail=None,
+                 ci_ell=2, spectral_params=None):
+    """ (iGraph.Graph(), str, str, str, bool, bool, str, dict, dict, dict, int, dict) -> list
+
+    Adaptive attack (DegU, BtwU, CIU, CoreU, EigU, PRU) or random attack
+    (Ran). CIU
+    removes the node of largest collective influence CI_ell, ell='ci_ell',
+    and updates it only in the ball of radius ell+1 of each removal, see
+    ci_attack.ciAttack. CoreU removes the node of largest core number
+    (ties to the larger degree), maintained incrementally by
+    kcore_attack.coreAttack. EigU and PRU remove the node of largest
+    eigenvector centrality or PageRank, re-solved after each removal by
+    power iteration warm-started from the previous vector, see
+    spectral_attack.spectralAttack, which takes 'spectral_params' as
+    keyword arguments. The iterations of every step are saved as
+    'spectral_log_<net_name>.txt'. For betweenness,
+    'btw_method' and 'btw_params' select how it is kept up to date, see
+    betweenness.betweennessTracker.
+
+    If 'btw_batch' is a dict (possibly empty), BtwU removes several top
+    nodes per recomputation with batch_attack.batchBetweennessAttack,
+    which takes it as keyword arguments, and its log is saved as
+    'batch_log_<net_name>.txt'. Needs an exact 'btw_method'.
+
+    'tail' finishes BtwU cheaply after the collapse of the giant
+    component, as in betweennessUpdateAttack. It is not used together
+    with 'btw_batch'.
+    """
         
     ## Create output directories if they don't exist
     if centrality == 'betweenness':
         output_dir = os.path.join(data_dir, 'BtwU')
     elif centrality == 'degree':
         output_dir = os.path.join(data_dir, 'DegU')
+    elif centrality == 'ci':
+        output_dir = os.path.join(data_dir, 'CIU')
+    elif centrality == 'coreness':
+        output_dir = os.path.join(data_dir, 'CoreU')
+    elif centrality == 'eigenvector':
+        output_dir = os.path.join(data_dir, 'EigU')
+    elif centrality == 'pagerank':
+        output_dir = os.path.join(data_dir, 'PRU')
     elif centrality == 'random':
         import random
         output_dir = os.path.join(data_dir, 'Ran')
@@ -415,10 +553,22 @@ def updateAttack(graph, data_dir, net_name, centrality='degree', overwrite=False
 
     output = "oi_list_" + net_name + ".txt"
     output_file = os.path.join(output_dir, output)
+    log_file = os.path.join(output_dir, 'btw_log_' + net_name + '.txt')
+    batch_file = os.path.join(output_dir, 'batch_log_' + net_name + '.txt')
+    spectral_file = os.path.join(output_dir, 'spectral_log_' + net_name + '.txt')
     if overwrite:
         if os.path.isfile(output_file):
             print('Removing file "' + output_file)
             os.remove(output_file)
+        if os.path.isfile(log_file):
+            os.remove(log_file)
+        exact_file = os.path.join(output_dir, 'exact_phase_' + net_name + '.txt')
+        if os.path.isfile(exact_file):
+            os.remove(exact_file)
+        if os.path.isfile(batch_file):
+            os.remove(batch_file)
+        if os.path.isfile(spectral_file):
+            os.remove(spectral_file)
 
     ## Create a copy of graph so as not to modify the original
     g = graph.copy()
@@ -436,10 +586,9 @@ def updateAttack(graph, data_dir, net_name, centrality='degree', overwrite=False
         components = g.components(mode='weak')
         g = components.giant()             
 
-    ## Save original index as a vertex property
+    ## Original indices are the vertex indices of the masked graph
     N0 = g.vcount()
-    n = N0
-    g.vs['original_index'] = range(n)
+    mg = MaskedGraph.fromIgraph(g)
     
     ## List with the node original indices in removal order
     original_indices = []
@@ -451,106 +600,118 @@ def updateAttack(graph, data_dir, net_name, centrality='degree', overwrite=False
             print('Ignoring file "' + output_file)
             return None
         else:
-            oi_values = np.loadtxt(output_file, dtype='int')
-            #for oi in oi_values:
-            #    idx = g.vs['original_index'].index(oi)
-            #    g.vs[idx].delete()
-            #    original_indices.append(oi)
-            #    j += 1
-            g.delete_vertices(oi_values)
+            oi_values = np.loadtxt(output_file, dtype='int', ndmin=1)
+            mg.removeNodes(oi_values)
             j += len(oi_values)
     
     with open(output_file, 'a+') as f:
+
+        if centrality == 'degree':
+            ## Bucket-queue engine, O(N + M) for the whole attack
+            for original_idx in degreeAttack(mg):
+                original_indices.append(original_idx)
+                f.write('{}\n'.format(original_idx))
+            j = N0
+
+        if centrality == 'ci':
+            ## Heap of CI values, updated in the ball of each removal
+            for original_idx in ciAttack(mg, ell=ci_ell):
+                original_indices.append(original_idx)
+                f.write('{}\n'.format(original_idx))
+            j = N0
+
+        if centrality == 'coreness':
+            ## Core numbers updated only on the subcores a removal reaches
+            for original_idx in coreAttack(mg):
+                original_indices.append(original_idx)
+                f.write('{}\n'.format(original_idx))
+            j = N0
+
+        if centrality in ['eigenvector', 'pagerank']:
+            ## Power iteration restarted from the previous step's vector
+            spectral_log = []
+            for original_idx in spectralAttack(mg, centrality, log=spectral_log,
+                                               **(spectral_params or {})):
+                original_indices.append(original_idx)
+                f.write('{}\n'.format(original_idx))
+            j = N0
+            with open(spectral_file, 'ab') as f_log:
+                np.savetxt(f_log, spectral_log, fmt='%d %d')
+    
+        if centrality == 'betweenness':
+            ## Betweenness is only recomputed where a removal can change it
+            cb = betweennessTracker(mg, btw_method, **(btw_params or {}))
+
+        if centrality == 'betweenness' and btw_batch is not None:
+            ## Top-k removals per recomputation, k adapted to rank stability
+            batch_log = []
+            for original_idx in batchBetweennessAttack(cb, log=batch_log, **btw_batch):
+                original_indices.append(original_idx)
+                f.write('{}\n'.format(original_idx))
+                f.flush()
+            j = N0
+            with open(batch_file, 'ab') as f_log:
+                np.savetxt(f_log, batch_log, fmt='%d %d %f %f %d')
     
         while j < N0:
 
+            if centrality == 'betweenness' and tail is not None and tailReached(cb, tail, N0):
+                for original_idx in finishTail(cb, tail, output_dir, net_name, j):
+                    original_indices.append(original_idx)
+                    f.write('{}\n'.format(original_idx))
+                j = N0
+                break
+
             ## Identify node to be removed
             if centrality == 'betweenness':
-                c_values = g.betweenness(directed=False, nobigint=False)
-                idx = max(enumerate(c_values), key=lambda x: x[1])[0]
-            elif centrality == 'degree':
-                c_values = g.degree()
-                idx = max(enumerate(c_values), key=lambda x: x[1])[0]
+                original_idx = cb.argmax()
+                cb.removeNode(original_idx)
             elif centrality == 'random':
                 idx = int(random.random()*(N0-j))
+                original_idx = int(mg.aliveNodes()[idx])
+                mg.removeNode(original_idx)
             
             ## Add index to list
-            original_idx = g.vs[idx]['original_index']
             original_indices.append(original_idx)
 
-            ## Remove node
-            idx = g.vs()['original_index'].index(original_idx)
-            g.vs[idx].delete()     
-
             j += 1
             
             f.write('{}\n'.format(original_idx))
             f.flush()
 
+    if centrality == 'betweenness':
+        saveBetweennessLog(cb, output_dir, net_name)
+        if hasattr(cb, 'close'):
+            cb.close()
+
     return original_indices
 
 def nonUpdateAttack(graph, data_dir, net_name, centrality='degree', overwrite=False, ignore_existing=True):
-        
-    ## Create output directories if they don't exist
-    if centrality == 'betweenness':
-        output_dir = os.path.join(data_dir, 'Btw')
-    elif centrality == 'degree':
-        output_dir = os.path.join(data_dir, 'Deg')
-    elif centrality == 'random':
-        output_dir = os.path.join(data_dir, 'Ran')
-    else:
-        print('ERROR: Centrality not supported')
-        return None
-    if not os.path.exists(output_dir):
-        os.mkdir(output_dir)
-
-    output = "oi_list_" + net_name + ".txt"
-    output_file = os.path.join(output_dir, output)
-    if overwrite:
-        if os.path.isfile(output_file):
-            print('Removing file "' + output_file)
-            os.remove(output_file)
-    else:
-        if os.path.isfile(output_file):
-            return
+    """ (iGraph.Graph(), str, str, str, bool, bool) -> np.array
 
-    ## Create a copy of graph so as not to modify the original
-    g = graph.copy()
-    
-    if not g.is_simple():
-        print('Network "' + net_name + '" will be considered as simple.')
-        g.simplify()
-        
-    if g.is_directed():
-        print('Network "' + net_name + '" will be considered as undirected.')
-        g.to_undirected()
-        
-    if not g.is_connected():
-        print('Only giant component of network "' + net_name + '" will be considered.')
-        components = g.components(mode='weak')
-        g = components.giant()             
+    Non-adaptive attack (Deg, Btw, Clo, Harm, Core, Eig or Ran) for a
+    single centrality, see static_attack.staticAttacks, which computes
+    several of them in one call.
 
-    ## Save original index as a vertex property
-    n = g.vcount()
-    g.vs['original_index'] = range(n)
+    Static orders are written in one go, so an existing file is always
+    complete: unless 'overwrite', it is ignored (None is returned) if
+    'ignore_existing', or else loaded and returned.
+    """
 
-    if centrality == 'random':
-        oi_arr = np.array(range(n))
-        np.random.shuffle(oi_arr)
-        original_indices = oi_arr
-    else:
-        ## Compute centrality
-        if centrality == 'betweenness':
-            c_values = g.betweenness(directed=False, nobigint=False)
-        elif centrality == 'degree':
-            c_values = g.degree()
+    if centrality not in STATIC_PREFIXES:
+        print('ERROR: Centrality not supported')
+        return None
 
-        ## List with the node original indices in removal order
-        original_indices = list(zip(*sorted(zip(g.vs['original_index'], c_values), 
-                            key=lambda x: x[1], reverse=True)))[0]
+    output_file = os.path.join(data_dir, STATIC_PREFIXES[centrality],
+                               'oi_list_' + net_name + '.txt')
+    if os.path.isfile(output_file) and not overwrite:
+        if ignore_existing:
+            print('Ignoring file "' + output_file)
+            return None
+        return np.loadtxt(output_file, dtype='int', ndmin=1)
 
-    np.savetxt(output_file, original_indices, fmt='%d')
-    return original_indices
+    orders = staticAttacks(graph, data_dir, net_name, [centrality], overwrite=overwrite)
+    return orders.get(centrality)
 
 def OldcentralityUpdateAttack(graph, data_dir, net_name, 
                            centrality='betweenness', 
@@ -0,0 +1,128 @@
+import numpy as np
+from scipy.stats import kendalltau
+
+
+def liveRanking(cb):
+    """ (ComponentBetweenness) -> np.array
+
+    Live nodes by decreasing betweenness (ties to the smallest index),
+    with cb.argmax() first so that single steps follow the exact BtwU.
+    """
+
+    nodes = cb.mg.aliveNodes()
+    if not len(nodes):
+        return nodes
+    values = cb.values()
+    ranking = nodes[np.lexsort((nodes, -values[nodes]))]
+    leader = cb.argmax()
+    return np.concatenate(([leader], ranking[ranking != leader]))
+
+def rankStability(expected, ranking, old_values, new_values, m):
+    """ (np.array, np.array, np.array, np.array, int) -> (float, float)
+
+    Overlap of the top-m sets of the ranking predicted before a batch
+    ('expected', the old ranking without the batch) and of the one
+    recomputed after it, and Kendall tau of the old and new values on
+    the predicted top m.
+    """
+
+    m = min(m, len(expected), len(ranking))
+    if not m:
+        return 1., 1.
+    top = expected[:m]
+    overlap = len(np.intersect1d(top, ranking[:m])) / m
+    if m < 2:
+        return overlap, 1.
+    tau = kendalltau(old_values[top], new_values[top])[0]
+    if np.isnan(tau):
+        tau = 1.
+    return overlap, tau
+
+def batchBetweennessAttack(cb, k_max=32, min_overlap=0.9, min_tau=0.8,
+                           probe=16, log=None):
+    """ (ComponentBetweenness, int, float, float, int, list) -> generator
+
+    Adaptive betweenness attack (BtwU) that removes the top k nodes of
+    the current ranking per betweenness recomputation and yields them
+    in removal order. 'cb' is modified in place.
+
+    After every batch the ranking is recomputed and compared with the
+    one predicted from the previous recomputation on the top
+    max(2k, probe) nodes. If both the top-set overlap and Kendall tau
+    reach 'min_overlap' and 'min_tau', k doubles (up to 'k_max'),
+    otherwise it is halved. A batch of k > 1 is checked against the
+    leader of the recomputed ranking, which should be among the next k
+    predicted nodes. Otherwise the batch is rolled back and replaced by
+    a single exact step, and k restarts from 1.
+
+    If 'log' is a list, one (removed so far, k, overlap, tau, rollback)
+    row is appended per recomputation.
+    """
+
+    k = 1
+    ranking = liveRanking(cb)
+    values = cb.values().copy()
+    n_removed = 0
+    while len(ranking):
+        batch = ranking[:k]
+        state = cb.saveState() if k > 1 else None
+        cb.removeNodes(batch)
+        new_ranking = liveRanking(cb)
+        expected = ranking[k:]
+
+        rollback = bool(k > 1 and len(new_ranking) and
+                        new_ranking[0] not in expected[:k])
+        if rollback:
+            cb.restoreState(state)
+            batch = ranking[:1]
+            expected = ranking[1:]
+            cb.removeNodes(batch)
+            new_ranking = liveRanking(cb)
+
+        new_values = cb.values()
+        overlap, tau = rankStability(expected, new_ranking, values, new_values,
+                                     max(2*len(batch), probe))
+        n_removed += len(batch)
+        if log is not None:
+            log.append((n_removed, len(batch), overlap, tau, int(rollback)))
+
+        if rollback:
+            k = 1
+        elif overlap >= min_overlap and tau >= min_tau:
+            k = min(2*k, k_max)
+        else:
+            k = max(k // 2, 1)
+
+        for v in batch:
+            yield int(v)
+        ranking = new_ranking
+        values = new_values.copy()
+
+def orderDrift(order, exact_order):
+    """ (list, list) -> (np.array, float)
+
+    Drift of a removal order from the exact one: the overlap of their
+    first t nodes for every t, and Kendall tau of the positions of the
+    nodes common to both.
+
+    >>> overlap, tau = orderDrift([1, 0, 2, 3], [0, 1, 2, 3])
+    >>> overlap.tolist(), tau
+    ([0.0, 1.0, 1.0, 1.0], 0.6666666666666669)
+    """
+
+    order = np.asarray(order, dtype=np.int64)
+    exact_order = np.asarray(exact_order, dtype=np.int64)
+    T = min(len(order), len(exact_order))
+    N = max(order.max(), exact_order.max()) + 1 if T else 0
+    pos_a = np.full(N, T)
+    pos_b = np.full(N, T)
+    pos_a[order[:T]] = np.arange(T)
+    pos_b[exact_order[:T]] = np.arange(T)
+    ## A node is in both prefixes of length t once t > max of its positions
+    enter = np.bincount(np.maximum(pos_a, pos_b)[np.union1d(order[:T], exact_order[:T])],
+                        minlength=T+1)[:T]
+    overlap = np.cumsum(enter) / np.arange(1, T+1)
+
+    common, idx_a, idx_b = np.intersect1d(order, exact_order, return_indices=True)
+    tau = float(kendalltau(idx_a, idx_b)[0])
+    return overlap, tau
@@ -0,0 +1,185 @@
+import numpy as np
+
+from csr_graph import MaskedGraph, singleSourceDependencies
+
+
+def blockCutTree(sub):
+    """ (iGraph.Graph()) -> dict
+
+    Biconnected blocks of 'sub' and the block-cut tree of each of its
+    components, rooted at the first block. Keys:
+        'blocks':       list of sorted vertex arrays, one per block.
+        'is_ap':        bool array, articulation points.
+        'parent_ap':    articulation point joining each block to its
+                        parent (-1 for roots).
+        'child_blocks': dict ap -> blocks hanging below it.
+        'S_block':      vertices in the subtree of each block.
+        'S_ap':         dict ap -> vertices in its subtree (itself included).
+        'comp_size':    size of the component of each vertex.
+    Trees hanging from the graph show up as chains of two-node blocks.
+    """
+
+    n = sub.vcount()
+    membership = np.array(sub.components().membership, dtype=np.int64)
+    comp_size = np.bincount(membership)[membership] if n else membership
+    blocks, aps = sub.biconnected_components(return_articulation_points=True)
+    blocks = [np.sort(np.array(b, dtype=np.int64)) for b in blocks]
+    n_blocks = len(blocks)
+
+    is_ap = np.zeros(n, dtype=bool)
+    is_ap[aps] = True
+    ap_blocks = {v: [] for v in aps}
+    block_aps = []
+    for b, nodes in enumerate(blocks):
+        block_aps.append(nodes[is_ap[nodes]].tolist())
+        for v in block_aps[b]:
+            ap_blocks[v].append(b)
+
+    ## Pre-order walk of the tree: parents come before children
+    parent_ap = [-1]*n_blocks
+    child_blocks = {v: [] for v in aps}
+    seen = [False]*n_blocks
+    order = []
+    for root in range(n_blocks):
+        if seen[root]:
+            continue
+        seen[root] = True
+        stack = [root]
+        while stack:
+            b = stack.pop()
+            order.append(b)
+            for v in block_aps[b]:
+                if v == parent_ap[b]:
+                    continue
+                for b2 in ap_blocks[v]:
+                    if not seen[b2]:
+                        seen[b2] = True
+                        parent_ap[b2] = v
+                        child_blocks[v].append(b2)
+                        stack.append(b2)
+
+    S_block = [0]*n_blocks
+    S_ap = {}
+    for b in reversed(order):
+        size = len(blocks[b]) - len(block_aps[b])
+        for v in block_aps[b]:
+            if v == parent_ap[b]:
+                continue
+            S_ap[v] = 1 + sum(S_block[b2] for b2 in child_blocks[v])
+            size += S_ap[v]
+        S_block[b] = size
+
+    return {
+        'blocks': blocks,
+        'is_ap': is_ap,
+        'parent_ap': parent_ap,
+        'child_blocks': child_blocks,
+        'S_block': S_block,
+        'S_ap': S_ap,
+        'comp_size': comp_size
+    }
+
+def blockCutBetweenness(sub, max_block_fraction=0.5):
+    """ (iGraph.Graph(), float) -> np.array
+
+    Exact betweenness of 'sub' (same normalization as
+    g.betweenness(directed=False)) through its block-cut tree.
+
+    Removing an articulation point v splits its component of n nodes in
+    pieces of sizes c_i, and every pair in different pieces goes
+    through v: sum_{i<j} c_i c_j. The remaining pairs through v enter
+    one of its blocks B at x and leave it at y (x, y != v), so they add
+        sum_{x<y in B} a(x) a(y) sigma_xy(v) / sigma_xy
+    where a(u) is the number of nodes reached from B through u (1 if u
+    is not an articulation point). That is a Brandes pass inside B with
+    weights a on sources and targets. Tree parts are made of two-node
+    blocks, which only get the analytic term, so dangling trees cost
+    O(size) and Brandes runs only inside the blocks of the 2-core.
+
+    Components whose largest block holds more than 'max_block_fraction'
+    of their nodes gain little from this and are computed directly with
+    igraph.
+
+    >>> import igraph as ig
+    >>> g = ig.Graph([(0, 1), (1, 2), (2, 0), (2, 3), (3, 4)])
+    >>> blockCutBetweenness(g, max_block_fraction=1.).tolist()
+    [0.0, 0.0, 4.0, 3.0, 0.0]
+    """
+
+    n = sub.vcount()
+    btw = np.zeros(n)
+    if n < 3:
+        return btw
+    tree = blockCutTree(sub)
+    blocks, is_ap = tree['blocks'], tree['is_ap']
+    parent_ap, S_block, S_ap = tree['parent_ap'], tree['S_block'], tree['S_ap']
+    comp_size = tree['comp_size']
+
+    ## Components dominated by one block go to igraph as a whole
+    largest = np.zeros(n, dtype=np.int64)
+    for nodes in blocks:
+        largest[nodes] = np.maximum(largest[nodes], len(nodes))
+    membership = np.array(sub.components().membership, dtype=np.int64)
+    comp_largest = np.zeros(membership.max()+1, dtype=np.int64)
+    np.maximum.at(comp_largest, membership, largest)
+    direct = comp_largest[membership] > max_block_fraction*comp_size
+    if direct.any():
+        nodes = np.flatnonzero(direct)
+        btw[nodes] = sub.induced_subgraph(nodes.tolist()).betweenness(directed=False)
+
+    for v, children in tree['child_blocks'].items():
+        if direct[v]:
+            continue
+        ## Children subtrees plus the rest of the component above v
+        pieces = [S_block[b] for b in children] + [comp_size[v] - S_ap[v]]
+        pieces = np.array(pieces, dtype=np.float64)
+        btw[v] += ((pieces.sum())**2 - (pieces**2).sum()) / 2.
+
+    smg = MaskedGraph.fromIgraph(sub)
+    for b, nodes in enumerate(blocks):
+        if len(nodes) < 3 or direct[nodes[0]]:
+            continue
+        weight = np.ones(len(nodes))
+        for i, u in enumerate(nodes):
+            if not is_ap[u]:
+                continue
+            if u == parent_ap[b]:
+                weight[i] = comp_size[u] - S_block[b]
+            else:
+                weight[i] = S_ap[u]
+        btw[nodes] += _weightedBrandes(smg, nodes, weight)
+
+    return btw
+
+def _weightedBrandes(smg, nodes, weight):
+    """ Betweenness inside the block induced by the sorted 'nodes' of
+    'smg' with pair (x, y) counted weight[x] weight[y] times.
+    """
+    nodes, edges = smg.inducedEdges(nodes)
+    mg = MaskedGraph.fromEdges(len(nodes), edges)
+    k = len(nodes)
+    total = np.zeros(k)
+    dist = np.full(k, -1, dtype=np.int64)
+    sigma = np.zeros(k)
+    delta = np.zeros(k)
+    for s in range(k):
+        visited = singleSourceDependencies(mg, s, dist, sigma, delta, weight)
+        total[visited] += weight[s] * delta[visited]
+        total[s] -= weight[s] * delta[s]
+        dist[visited] = -1
+        sigma[visited] = 0.
+        delta[visited] = 0.
+    return total / 2.
+
+def blockCutKernel(mg, nodes, max_block_fraction=0.5):
+    """ (MaskedGraph, np.array, float) -> np.array
+
+    Betweenness kernel for the trackers in betweenness.py: exact
+    betweenness of the live subgraph induced by 'nodes' with
+    blockCutBetweenness, as a length-N array.
+    """
+
+    sub, nodes = mg.subgraph(nodes)
+    btw = np.zeros(mg.N)
+    btw[nodes] = blockCutBetweenness(sub, max_block_fraction)
+    return btw
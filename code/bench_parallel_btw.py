@@ -0,0 +1,58 @@
+import igraph as ig
+import numpy as np
+import sys
+import time
+
+from csr_graph import MaskedGraph
+from parallel_betweenness import ParallelBetweenness
+
+## Usage: python bench_parallel_btw.py [max_N] [w1,w2,...]
+## ER sizes are those of scripts/script.sh. Pool startup is reported
+## apart, since it is paid once per attack.
+
+ER_nets = [
+    (1000, 0.004),
+    (2000, 0.002),
+    (4000, 0.001),
+    (8000, 0.0005),
+    (16000, 0.00025),
+    (32000, 0.000125)
+]
+
+max_N = int(sys.argv[1]) if len(sys.argv) > 1 else 32000
+if len(sys.argv) > 2:
+    workers = [int(w) for w in sys.argv[2].split(',')]
+else:
+    workers = [1, 2, 4, 8, 16, 32, 64]
+
+print('{:>6} {:>8} {:>10} {:>10} {:>10} {:>8}'.format(
+    'N', 'workers', 'startup', 'time', 'igraph', 'speedup'))
+
+for N, p in ER_nets:
+    if N > max_N:
+        break
+    g = ig.Graph.Erdos_Renyi(N, p)
+    mg = MaskedGraph.fromIgraph(g)
+    nodes = mg.aliveNodes()
+
+    t0 = time.time()
+    btw_ig = np.array(g.betweenness(directed=False))
+    t_ig = time.time() - t0
+
+    t_ref = None
+    for n_workers in workers:
+        t0 = time.time()
+        kernel = ParallelBetweenness(mg, n_workers, min_nodes=0)
+        t_startup = time.time() - t0
+
+        t0 = time.time()
+        btw = kernel(mg, nodes)
+        t_btw = time.time() - t0
+        kernel.close()
+
+        if not np.allclose(btw, btw_ig):
+            print('ERROR: parallel betweenness differs from igraph')
+        if t_ref is None:
+            t_ref = t_btw
+        print('{:>6} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>8.2f}'.format(
+            N, n_workers, t_startup, t_btw, t_ig, t_ref / t_btw))
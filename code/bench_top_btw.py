@@ -0,0 +1,89 @@
+import igraph as ig
+import numpy as np
+import sys
+import time
+
+## Usage: python bench_top_btw.py [max_N] [steps] [delta]
+## ER sizes are those of scripts/script.sh. On the giant component, each
+## BtwU step is decided by certifying the top betweenness node from
+## sampled sources and compared with exact igraph betweenness.
+##
+## Sources are drawn without replacement in doubling batches. One BFS
+## per source (igraph, sources=[s]) gives its dependencies on every
+## target, 2 delta_s(w) / (n - 2) in [0, 1], whose mean over sources is
+## the normalized betweenness. The top node is certified when its
+## empirical Bernstein lower bound beats the upper bound of every other
+## node (confidence 1 - delta, union bound over nodes and rounds).
+##
+## Negative result, which is why no top-1 tracker is offered: on the ER
+## giant of N=4000 (3923 nodes), every one of the first 12 steps needed
+## all n sources, even with a 9% gap between the two largest values,
+## i.e. certification costs exact Brandes plus the per-source calls
+## (5.8 s against 1.5 s per step).
+
+ER_nets = [
+    (1000, 0.004),
+    (2000, 0.002),
+    (4000, 0.001),
+    (8000, 0.0005),
+    (16000, 0.00025),
+    (32000, 0.000125)
+]
+
+max_N = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+steps = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+delta = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+
+def empiricalBernsteinRadius(mean, var, k, delta):
+    """ Maurer-Pontil radius of the mean of k samples in [0, 1]. """
+    L = np.log(2. / delta)
+    return np.sqrt(2 * var * L / k) + 7 * L / (3 * (k - 1))
+
+def certifiedTop(g, rng, delta, batch=64):
+    """ Returns (top node, number of sources used). """
+    n = g.vcount()
+    order = rng.permutation(n)
+    total = np.zeros(n)
+    total2 = np.zeros(n)
+    k = 0
+    round_idx = 0
+    while True:
+        for s in order[k:k+batch]:
+            x = np.array(g.betweenness(directed=False, sources=[int(s)])) * 2. / (n - 2)
+            total += x
+            total2 += x*x
+        k = min(n, k + batch)
+        batch *= 2
+        round_idx += 1
+        if k == n:
+            return int(np.argmax(total)), k
+        mean = total / k
+        var = np.maximum(total2 / k - mean**2, 0) * k / (k - 1)
+        radius = empiricalBernsteinRadius(mean, var, k, delta / (n * round_idx))
+        top = int(np.argmax(mean))
+        upper = mean + radius
+        upper[top] = -np.inf
+        if mean[top] - radius[top] > upper.max():
+            return top, k
+
+print('{:>6} {:>5} {:>6} {:>8} {:>10} {:>10} {:>6}'.format(
+    'N', 'step', 'n', 'sources', 'certified', 'exact', 'same'))
+
+for N, p in ER_nets:
+    if N > max_N:
+        break
+    g = ig.Graph.Erdos_Renyi(N, p).components().giant()
+    rng = np.random.default_rng(N)
+    for step in range(steps):
+        t0 = time.time()
+        top, k = certifiedTop(g, rng, delta)
+        t_cert = time.time() - t0
+
+        t0 = time.time()
+        btw = np.array(g.betweenness(directed=False))
+        t_exact = time.time() - t0
+
+        v = int(np.argmax(btw))
+        print('{:>6} {:>5} {:>6} {:>8} {:>10.3f} {:>10.3f} {:>6}'.format(
+            N, step, g.vcount(), k, t_cert, t_exact, str(top == v)))
+        g.delete_vertices(v)
@@ -0,0 +1,441 @@
+import copy
+import heapq
+import numpy as np
+from functools import partial
+from scipy.sparse.csgraph import shortest_path
+
+from csr_graph import liveArgmax, singleSourceDependencies
+from approx_betweenness import SampledBetweenness
+from parallel_betweenness import ParallelBetweenness
+from bcc_betweenness import blockCutKernel
+
+
+def igraphKernel(mg, nodes):
+    """ (MaskedGraph, np.array) -> np.array
+
+    Exact betweenness of the live subgraph induced by 'nodes', which
+    must be a union of live components, with igraph's C Brandes.
+    """
+
+    return mg.igraphBetweenness(nodes)
+
+
+class ComponentBetweenness:
+    """ Betweenness of a masked graph under node removals, recomputed
+    only on the component that contained the removed node.
+
+    Each live node carries the label of its component. Removing a node
+    splits (or shrinks) only its own component, so the cached values of
+    every other component stay exact and Brandes ('kernel') reruns on
+    the pieces of the affected one. Past the critical point the graph is
+    made of many small frozen components and a step costs O(size of the
+    component that was hit).
+
+    'kernel(mg, nodes)' returns the betweenness of the live subgraph
+    induced by 'nodes' as a length-N array.
+    """
+
+    def __init__(self, mg, kernel=igraphKernel):
+        self.mg = mg
+        self.kernel = kernel
+        self.btw = np.zeros(mg.N)
+        self.labels = np.full(mg.N, -1, dtype=np.int64)
+        self.members = {}
+        self.sizes = []
+        self.n_labels = 0
+        self.n_kernel_calls = 0
+
+        n_comp, labels = mg.components()
+        alive = mg.aliveNodes()
+        order = alive[np.argsort(labels[alive], kind='stable')]
+        bounds = np.searchsorted(labels[order], np.arange(n_comp+1))
+        for c in range(n_comp):
+            self._addComponent(order[bounds[c]:bounds[c+1]])
+
+    def _addComponent(self, nodes):
+        label = self.n_labels
+        self.n_labels += 1
+        self.labels[nodes] = label
+        self.members[label] = nodes
+        heapq.heappush(self.sizes, (-len(nodes), label))
+        if len(nodes) > 2:
+            self.btw[nodes] = self.kernel(self.mg, nodes)[nodes]
+            self.n_kernel_calls += 1
+        else:
+            self.btw[nodes] = 0.
+
+    def close(self):
+        """ Releases the resources held by the kernel, if any. """
+        if hasattr(self.kernel, 'close'):
+            self.kernel.close()
+
+    def values(self):
+        """ Current betweenness of every node (0 for removed nodes). """
+        return self.btw
+
+    def argmax(self, nodes=None):
+        """ Live node with the largest betweenness, ties to the smallest
+        original index.
+        """
+        return liveArgmax(self.mg, self.btw, nodes)
+
+    def giantSize(self):
+        """ Size of the largest live component, from a lazy heap of
+        component sizes (a label leaves 'members' when it is replaced).
+        """
+        while self.sizes and self.sizes[0][1] not in self.members:
+            heapq.heappop(self.sizes)
+        return -self.sizes[0][0] if self.sizes else 0
+
+    def removeNode(self, v):
+        """ Removes node v from the graph and updates the betweenness of
+        its component.
+        """
+        self.removeNodes([v])
+
+    def removeNodes(self, nodes):
+        """ Removes all 'nodes' and then recomputes once each of the
+        components they belonged to.
+        """
+        nodes = np.unique(np.asarray(nodes, dtype=np.int64))
+        hit = np.unique(self.labels[nodes])
+        pool = np.concatenate([self.members.pop(label) for label in hit])
+        self.mg.removeNodes(nodes)
+        self.btw[nodes] = 0.
+        self.labels[nodes] = -1
+
+        pool = pool[self.mg.alive[pool]]
+        if not len(pool):
+            return
+        sub, pool = self.mg.subgraph(pool)
+        membership = np.array(sub.components().membership)
+        order = np.argsort(membership, kind='stable')
+        bounds = np.searchsorted(membership[order], np.arange(membership.max()+2))
+        for c in range(len(bounds)-1):
+            self._addComponent(pool[order[bounds[c]:bounds[c+1]]])
+
+    def copy(self, mg):
+        """ Copy of the tracker on 'mg', which must be a copy of self.mg.
+        The kernel is shared.
+        """
+        cb = copy.copy(self)
+        cb.mg = mg
+        cb.btw = self.btw.copy()
+        cb.labels = self.labels.copy()
+        cb.members = dict(self.members)
+        cb.sizes = list(self.sizes)
+        return cb
+
+    def saveState(self):
+        """ Snapshot of the graph and of the betweenness, for restoreState. """
+        mg = self.mg
+        return (mg.alive.copy(), mg.deg.copy(), mg.n_alive, self.btw.copy(),
+                self.labels.copy(), dict(self.members))
+
+    def restoreState(self, state):
+        """ Brings back the graph and the betweenness of a saveState
+        snapshot. Arrays are restored in place, so views stay valid.
+        """
+        alive, deg, n_alive, btw, labels, members = state
+        self.mg.alive[:] = alive
+        self.mg.deg[:] = deg
+        self.mg.n_alive = n_alive
+        self.btw[:] = btw
+        self.labels[:] = labels
+        self.members = dict(members)
+        self.sizes = [(-len(nodes), c) for c, nodes in self.members.items()]
+        heapq.heapify(self.sizes)
+
+
+class DecrementalBetweenness(ComponentBetweenness):
+    """ Exact betweenness under node removals that only redoes the
+    single-source stages whose shortest-path DAG goes through the
+    removed node.
+
+    Writing 2 btw(w) as the sum of the pair dependencies delta_st(w)
+    over ordered pairs, removing v splits the sources s of its
+    component in two sets:
+        L: v has no successor in the DAG of s. Distances and path
+           counts from s do not change and only the pair (s, v) is
+           lost. By symmetry sum_{s in L} delta_sv = sum_{s in L} delta_vs,
+           which comes out of a single pass from v.
+        A: v is an inner node of the DAG of s. The contribution of s
+           is subtracted (computed before the removal) and added back
+           once recomputed after it.
+    A step costs 2 |A| + 1 NumPy single-source passes. If the component
+    splits, every source has v as an inner node, so with max_affected
+    below 1 a decremental step never splits it.
+
+    s is in A exactly when delta_s(v) > 0, so |A| >= 2 btw(v) / (n - 1)
+    for a component of n nodes besides v, and A is empty if btw(v) = 0
+    or v is a leaf. These bounds are checked first: when they already
+    put |A| above 'max_affected' times n (as for the largest betweenness
+    node in an adaptive attack) the pieces of the component are
+    recomputed from scratch with 'kernel' (full Brandes), as in
+    ComponentBetweenness, without any search.
+
+    Otherwise a search for A only pays off for nodes of small
+    betweenness: on ER graphs every node with btw(v) > 0 had |A| above
+    18% of its component. The search is skipped, again for the full
+    recomputation, when btw(v) is more than 'max_search' times the
+    largest betweenness of the component. This is only a heuristic,
+    but skipping never changes the values.
+
+    A is read from the distances to v and to its neighbours.
+    They come from a dense int16 distance matrix of the component, kept
+    while it fits in 'memory_cap' bytes and updated in place with the
+    distances of the recomputed sources (those of L do not change).
+    Components too large for it get one BFS per neighbour of v instead.
+
+    'stats' counts decremental and full steps, recomputed sources,
+    steps decided by the bounds alone, searches for A and distance
+    matrix builds.
+
+    It is not offered by betweennessTracker: in BtwU the removed node
+    has the largest betweenness, so every step falls back to the full
+    recomputation and the tracker only matches ComponentBetweenness.
+    It wins on removal orders that hit low betweenness nodes, see
+    bench_decremental_btw.py.
+    """
+
+    def __init__(self, mg, max_affected=0.1, memory_cap=2**28, max_search=0.01,
+                 kernel=igraphKernel):
+        self.max_affected = max_affected
+        self.memory_cap = memory_cap
+        self.max_search = max_search
+        self.stats = {'decremental': 0, 'full': 0, 'sources': 0,
+                      'bound': 0, 'searches': 0, 'cache_builds': 0}
+        super().__init__(mg, kernel)
+        self.dist = np.full(mg.N, -1, dtype=np.int64)
+        self.sigma = np.zeros(mg.N)
+        self.delta = np.zeros(mg.N)
+        ## (label, component nodes, distance matrix) of one component
+        self.cache = None
+        self.warm = -1
+
+    def copy(self, mg):
+        """ Copy of the tracker on 'mg'. The distance matrix is not
+        copied and is built again when needed.
+        """
+        cb = super().copy(mg)
+        cb.stats = dict(self.stats)
+        cb.cache = None
+        cb.warm = -1
+        return cb
+
+    def restoreState(self, state):
+        super().restoreState(state)
+        self.cache = None
+        self.warm = -1
+
+    def _dependencySum(self, sources, target_weight=None, cache=None):
+        """ Sum of the dependency vectors of 'sources' on the current
+        graph. The distances from each source are written to the
+        distance matrix 'cache', if given.
+        """
+        total = np.zeros(self.mg.N)
+        for s in sources:
+            visited = singleSourceDependencies(self.mg, s, self.dist, self.sigma, 
+                                               self.delta, target_weight)
+            total[visited] += self.delta[visited]
+            total[s] -= self.delta[s]
+            if cache is not None:
+                _, comp, D = cache
+                r = np.searchsorted(comp, s)
+                D[r] = self.dist[comp]
+                D[:,r] = D[r]
+            self.dist[visited] = -1
+            self.sigma[visited] = 0.
+            self.delta[visited] = 0.
+        return total
+
+    def _distanceCache(self, label, nodes):
+        """ Distance matrix of the component 'label' (the live 'nodes'),
+        built with one block of scipy BFS at a time, or None if it does
+        not fit in memory_cap. It is only built for a component whose
+        last step was decremental after a search, so that a step ending
+        in the full fallback does not pay for it.
+        """
+        if self.cache is not None and self.cache[0] == label:
+            return self.cache
+        n = len(nodes)
+        if label != self.warm or 2*n*n > self.memory_cap:
+            return None
+        self.cache = None
+        adj, comp = self.mg.adjacency(nodes)
+        D = np.empty((n, n), dtype=np.int16)
+        b = max(1, self.memory_cap // (16*n))
+        for start in range(0, n, b):
+            dist = shortest_path(adj, unweighted=True, indices=np.arange(start, min(n, start+b)))
+            D[start:start+b] = np.where(np.isinf(dist), -1, dist)
+        self.cache = (label, comp, D)
+        self.stats['cache_builds'] += 1
+        return self.cache
+
+    def _affectedSources(self, v, nodes, cache=None):
+        """ Sources of 'nodes' (the component of v without v) whose
+        shortest-path DAG has v as an inner node, read from the
+        distance matrix 'cache' if given or else from one BFS per
+        neighbour of v.
+        """
+        nbrs = self.mg.neighbors(v)
+        if cache is not None:
+            _, comp, D = cache
+            local = np.searchsorted(comp, np.append(nbrs, v))
+            dist = D[local].astype(np.int64)
+            dist[dist < 0] = -2
+        else:
+            adj, comp = self.mg.adjacency(np.append(nodes, v))
+            local = np.searchsorted(comp, np.append(nbrs, v))
+            dist = shortest_path(adj, unweighted=True, indices=local)
+        d_v = dist[-1]
+        inner = (dist[:-1] == d_v[None,:] + 1).any(axis=0)
+        inner[local[-1]] = False
+        return comp[inner]
+
+    def removeNode(self, v):
+        """ Removes node v from the graph and updates the betweenness of
+        its component.
+        """
+        label = self.labels[v]
+        nodes = self.members.pop(label)
+        n = len(nodes) - 1
+        deg = len(self.mg.neighbors(v))
+
+        cache = self.cache if self.cache is not None and self.cache[0] == label else None
+        searched = False
+        decremental = n > 2
+        if decremental and (deg < 2 or self.btw[v] == 0.):
+            affected = np.array([], dtype=np.int64)
+            self.stats['bound'] += 1
+        elif decremental and 2*self.btw[v] > self.max_affected*n*(n-1):
+            decremental = False
+            self.stats['bound'] += 1
+        elif decremental and self.btw[v] > self.max_search*self.btw[nodes].max():
+            decremental = False
+        elif decremental:
+            searched = True
+            self.stats['searches'] += 1
+            cache = self._distanceCache(label, nodes)
+            if cache is None and 8*(deg+1)*(n+1) > self.memory_cap:
+                decremental = False
+            else:
+                affected = self._affectedSources(v, nodes[nodes != v], cache)
+                decremental = len(affected) <= self.max_affected*n
+        nodes = nodes[nodes != v]
+
+        if decremental:
+            ## Weight 2 on targets in L: pairs (v, t) and (t, v) are lost
+            target_weight = np.zeros(self.mg.N)
+            target_weight[nodes] = 2.
+            target_weight[affected] = 1.
+            old = self._dependencySum([v], target_weight) + \
+                  self._dependencySum(affected)
+            self.mg.removeNode(v)
+            new = self._dependencySum(affected, cache=cache)
+            self.btw[nodes] += (new[nodes] - old[nodes]) / 2.
+            if cache is not None:
+                _, comp, D = cache
+                r = np.searchsorted(comp, v)
+                D[r] = -1
+                D[:,r] = -1
+            self.stats['decremental'] += 1
+            self.stats['sources'] += 2*len(affected) + 1
+        else:
+            self.mg.removeNode(v)
+            if n > 2:
+                self.stats['full'] += 1
+        self.btw[v] = 0.
+        self.labels[v] = -1
+        if not decremental and self.cache is not None and self.cache[0] == label:
+            self.cache = None
+
+        if not n:
+            return
+        if decremental and len(affected) < n:
+            ## Only a component where every source goes through v can split
+            self._relabel(nodes, label, searched)
+            return
+        sub, nodes = self.mg.subgraph(nodes)
+        membership = np.array(sub.components().membership)
+        order = np.argsort(membership, kind='stable')
+        bounds = np.searchsorted(membership[order], np.arange(membership.max()+2))
+        for c in range(len(bounds)-1):
+            piece = nodes[order[bounds[c]:bounds[c+1]]]
+            if decremental:
+                self._relabel(piece)
+            else:
+                self._addComponent(piece)
+
+    def _relabel(self, nodes, old_label=None, warm=False):
+        """ Registers a piece whose betweenness is already up to date.
+        If it is the whole component 'old_label' after a decremental
+        step, its distance matrix follows it, and if that step needed a
+        search ('warm') the matrix may be built on the next one.
+        """
+        label = self.n_labels
+        self.n_labels += 1
+        self.labels[nodes] = label
+        self.members[label] = nodes
+        heapq.heappush(self.sizes, (-len(nodes), label))
+        if warm:
+            self.warm = label
+        if self.cache is not None and self.cache[0] == old_label:
+            self.cache = (label,) + self.cache[1:]
+
+
+def betweennessTracker(mg, method='component', **kwargs):
+    """ (MaskedGraph, str, ...) -> ComponentBetweenness
+
+    Returns the object that keeps the betweenness of 'mg' up to date
+    during an adaptive attack. Methods allowed:
+        'component':   ComponentBetweenness (exact).
+        'approx':      SampledBetweenness, Brandes-Pich estimate from a
+                       fraction 'pivots' of the live nodes (or enough
+                       for an (eps, delta) bound if 'eps' is given).
+        'parallel':    ComponentBetweenness (exact) with the multi-process
+                       kernel ParallelBetweenness. Accepts 'n_workers'
+                       and 'min_nodes'.
+        'blockcut':    ComponentBetweenness (exact) with blockCutKernel,
+                       Brandes only inside biconnected blocks. Accepts
+                       'max_block_fraction'.
+    Extra keyword arguments are passed to the constructor.
+    """
+
+    if method == 'component':
+        return ComponentBetweenness(mg, **kwargs)
+    elif method == 'approx':
+        return SampledBetweenness(mg, **kwargs)
+    elif method == 'parallel':
+        return ComponentBetweenness(mg, kernel=ParallelBetweenness(mg, **kwargs))
+    elif method == 'blockcut':
+        return ComponentBetweenness(mg, kernel=partial(blockCutKernel, **kwargs))
+    else:
+        raise ValueError('Betweenness method "{}" is not supported'.format(method))
+
+
+def tailOrder(cb, policy='components'):
+    """ (ComponentBetweenness, str) -> list
+
+    Removal order for all the live nodes of cb.mg computed without any
+    further betweenness recomputation, to finish an attack once the
+    giant component has collapsed. Policies:
+        'components': components by decreasing size, and the nodes of
+                      each one by decreasing current betweenness.
+        'static':     all nodes by decreasing current betweenness.
+    Ties go to the smallest original index.
+    """
+
+    mg = cb.mg
+    nodes = mg.aliveNodes()
+    values = cb.values()[nodes]
+    if policy == 'static':
+        order = np.lexsort((nodes, -values))
+    elif policy == 'components':
+        n_comp, labels = mg.components()
+        labels = labels[nodes]
+        sizes = np.bincount(labels, minlength=n_comp)[labels]
+        order = np.lexsort((nodes, -values, labels, -sizes))
+    else:
+        raise ValueError('Tail policy "{}" is not supported'.format(policy))
+    return nodes[order].tolist()
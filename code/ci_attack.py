@@ -0,0 +1,179 @@
+import heapq
+import numpy as np
+
+from decremental_components import DecrementalComponents
+
+
+class CollectiveInfluence:
+    """ Collective influence of the live nodes of a masked graph,
+
+        CI_ell(i) = (k_i - 1) sum_{j at distance ell from i} (k_j - 1)
+
+    with live degrees k, kept up to date under node removals. Removing
+    v can only change CI inside the ball of radius ell+1 around it, so
+    only those nodes are recomputed and the cost of a step depends on
+    the size of that ball, not on N.
+
+    The nodes that are candidates for removal (all live nodes, or the
+    ones given to restrict()) live in a lazy max-heap keyed by
+    (CI, degree), ties to the smallest index. Removals are applied to
+    'mg' as well unless it already lost the node, so the tracker can
+    follow another one sharing the masked graph.
+
+    >>> from csr_graph import MaskedGraph
+    >>> edges = np.array([(0, 1), (1, 2), (2, 3), (3, 4), (1, 5), (3, 6)])
+    >>> ci = CollectiveInfluence(MaskedGraph.fromEdges(7, edges), ell=1)
+    >>> ci.values().tolist(), ci.argmax()
+    ([0, 2, 4, 2, 0, 0, 0], 2)
+    """
+
+    def __init__(self, mg, ell=2):
+        self.mg = mg
+        self.ell = ell
+        self.indptr = mg.indptr.tolist()
+        self.indices = mg.indices.tolist()
+        self.alive = mg.alive.tolist()
+        self.deg = mg.degree().tolist()
+        self.ci = [0]*mg.N
+        self.mark = [0]*mg.N
+        self.stamp = 0
+        for v in mg.aliveNodes().tolist():
+            self.ci[v] = self._compute(v)
+        self.restrict(mg.aliveNodes())
+
+    def _ball(self, v, radius):
+        """ Live nodes at distance 0, 1, ..., radius from v, by layer. """
+        indptr, indices, alive, mark = self.indptr, self.indices, self.alive, self.mark
+        ## A fresh stamp marks the nodes seen by this search
+        self.stamp += 1
+        stamp = self.stamp
+        mark[v] = stamp
+        layers = [[v]]
+        for _ in range(radius):
+            layer = []
+            for u in layers[-1]:
+                for w in indices[indptr[u]:indptr[u+1]]:
+                    if alive[w] and mark[w] != stamp:
+                        mark[w] = stamp
+                        layer.append(w)
+            if not layer:
+                break
+            layers.append(layer)
+        return layers
+
+    def _compute(self, v):
+        deg = self.deg
+        if deg[v] < 2:
+            return 0
+        if not self.ell:
+            return (deg[v] - 1)**2
+        ## Inner layers of the ball, then the frontier summed on the fly
+        layers = self._ball(v, self.ell - 1)
+        if len(layers) < self.ell:
+            return 0
+        indptr, indices, alive, mark = self.indptr, self.indices, self.alive, self.mark
+        stamp = self.stamp
+        total = 0
+        for u in layers[-1]:
+            for w in indices[indptr[u]:indptr[u+1]]:
+                if alive[w] and mark[w] != stamp:
+                    mark[w] = stamp
+                    total += deg[w] - 1
+        return (deg[v] - 1) * total
+
+    def _push(self, v):
+        heapq.heappush(self.heap, (-self.ci[v], -self.deg[v], v))
+
+    def restrict(self, nodes):
+        """ Makes 'nodes' the only candidates of argmax(). """
+        self.candidate = [False]*self.mg.N
+        self.heap = []
+        for v in np.asarray(nodes).tolist():
+            self.candidate[v] = True
+            self.heap.append((-self.ci[v], -self.deg[v], v))
+        heapq.heapify(self.heap)
+
+    def values(self):
+        return np.array(self.ci)
+
+    def argmax(self, nodes=None):
+        """ Candidate with the largest (CI, degree), ties to the
+        smallest index, or None if there is none. If 'nodes' is given
+        the maximum is taken over them instead, in O(len(nodes)).
+        """
+        if nodes is not None:
+            nodes = np.asarray(nodes, dtype=np.int64)
+            if not len(nodes):
+                return None
+            ci = np.array(self.ci)[nodes]
+            deg = np.array(self.deg)[nodes]
+            return int(nodes[np.lexsort((nodes, -deg, -ci))[0]])
+        heap = self.heap
+        while heap:
+            c, k, v = heap[0]
+            if self.candidate[v] and -c == self.ci[v] and -k == self.deg[v]:
+                return v
+            heapq.heappop(heap)
+        return None
+
+    def removeNode(self, v):
+        """ Removes node v and recomputes CI in its ball of radius ell+1. """
+        ball = [u for layer in self._ball(v, self.ell+1)[1:] for u in layer]
+        self.alive[v] = False
+        self.candidate[v] = False
+        self.ci[v] = 0
+        for w in self.indices[self.indptr[v]:self.indptr[v+1]]:
+            if self.alive[w]:
+                self.deg[w] -= 1
+        self.deg[v] = 0
+        if self.mg.alive[v]:
+            self.mg.removeNode(v)
+        for u in ball:
+            self.ci[u] = self._compute(u)
+            if self.candidate[u]:
+                self._push(u)
+
+def ciAttack(mg, ell=2, followGiant=False):
+    """ (MaskedGraph, int, bool) -> list
+
+    Adaptive collective-influence attack (CIU, or CIGU if
+    'followGiant') on the masked graph 'mg', which is modified in
+    place: the node of largest CI_ell is removed at every step (ties
+    to the larger degree, then the smallest index) and CI is updated
+    locally, see CollectiveInfluence. Returns the original indices of
+    the removed nodes.
+
+    In followGiant mode only nodes of the current giant component are
+    attacked and the attack stops when it has less than two nodes, as
+    in degreeAttack. The candidates are reset to the giant component
+    only when it splits.
+
+    >>> from csr_graph import MaskedGraph
+    >>> edges = np.array([(0, 1), (1, 2), (2, 3), (3, 4), (1, 5), (3, 6)])
+    >>> ciAttack(MaskedGraph.fromEdges(7, edges), ell=1)
+    [2, 1, 3, 0, 4, 5, 6]
+    """
+
+    ci = CollectiveInfluence(mg, ell)
+    if followGiant:
+        dc = DecrementalComponents(mg)
+        ci.restrict(dc.giantNodes())
+
+    original_indices = []
+    while True:
+        if followGiant and dc.giantSize() < 2:
+            break
+        v = ci.argmax()
+        if v is None:
+            break
+        original_indices.append(int(v))
+        if followGiant:
+            giant, n_gcc = dc.giantLabel(), dc.giantSize()
+            ci.removeNode(v)
+            dc.removeNode(v)
+            if dc.giantSize() != n_gcc - 1 or dc.giantLabel() != giant:
+                ci.restrict(dc.giantNodes())
+        else:
+            ci.removeNode(v)
+
+    return original_indices
@@ -0,0 +1,91 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+## Aggregates the edge-removal attacks of edge_attack.py over seeds, as
+## create_csv.py does for the node attacks. Their comp_data files have
+## one row per removed edge, in removal order, with the columns of
+## get_components.py (Ngcc, Nsec, meanS, meanS2). The number of edges M
+## changes with the seed, so every curve is sampled at the fractions of
+## removed edges t = 0, 1/N, ..., (N-1)/N before averaging.
+##
+## Usage: python create_edge_csv.py net_type size param min_seed max_seed
+##                                  [EdgeBtwU] [EdgeBtw] [EdgeRan] [overwrite]
+
+net_type = sys.argv[1]
+size = int(sys.argv[2])
+param = sys.argv[3]
+min_seed = int(sys.argv[4])
+max_seed = int(sys.argv[5])
+
+if net_type == 'ER':
+    N = size
+    p = param
+    base_net_name = 'ER_N{}_p{}'.format(N, p)
+elif net_type == 'BA':
+    N = size
+    m = param
+    base_net_name = 'BA_N{}_m{}'.format(N, m)
+elif net_type == 'Lattice':
+    L = size
+    N = L*L
+    p = param
+    base_net_name = 'Lattice_L{}_f{}'.format(L, p)
+
+if 'overwrite' in sys.argv:
+    overwrite = True
+else:
+    overwrite = False
+
+attacks = []
+for attack in ['EdgeBtwU', 'EdgeBtw', 'EdgeRan']:
+    if attack in sys.argv:
+        attacks.append(attack)
+
+dir_name = os.path.join('../networks', net_type)
+t_values = np.arange(N) / N
+
+for attack in attacks:
+    print(attack)
+
+    csv_file_name = os.path.join(dir_name, base_net_name, '{}.csv'.format(attack))
+    if not overwrite:
+        if os.path.isfile(csv_file_name):
+            continue
+
+    Ngcc_values = []
+    Nsec_values = []
+    meanS2_values = []
+
+    for seed in range(min_seed, max_seed):
+
+        network = base_net_name + '_{:05d}'.format(seed)
+        attack_dir_name = os.path.join(dir_name, base_net_name, network, attack)
+
+        full_file_name = os.path.join(attack_dir_name, 'comp_data_' + network + '.txt')
+        if not os.path.isfile(full_file_name):
+            continue
+        print(seed)
+
+        aux = np.loadtxt(full_file_name, dtype=float, ndmin=2)
+
+        t_edges = np.arange(aux.shape[0]) / aux.shape[0]
+        Ngcc_values.append(np.interp(t_values, t_edges, aux[:,0]))
+        Nsec_values.append(np.interp(t_values, t_edges, aux[:,1]))
+        meanS2_values.append(np.interp(t_values, t_edges, aux[:,3]))
+
+    if not Ngcc_values:
+        continue
+
+    Ngcc_values = np.array(Ngcc_values)
+    d = {
+        't': t_values,
+        'Sgcc': np.mean(Ngcc_values, axis=0)/N,
+        'varSgcc': np.var(Ngcc_values, axis=0)/N,
+        'Nsec': np.mean(Nsec_values, axis=0),
+        'meanS2': np.nanmean(meanS2_values, axis=0),
+        'binder': 1 - np.mean(Ngcc_values**4, axis=0) / (3*(np.mean(Ngcc_values**2, axis=0))**2)
+    }
+    df = pd.DataFrame(data=d)
+    df.to_csv(csv_file_name)
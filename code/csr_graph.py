@@ -0,0 +1,293 @@
+import numpy as np
+import igraph as ig
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from percolation import getEdgeArray, buildCSR, expandFrontier
+
+
+def argmaxFirst(values, rtol=1e-9, atol=1e-9):
+    """ (np.array, float, float) -> int
+
+    Index of the maximum of 'values'. Values within a tolerance
+    rtol*|max| + atol of the maximum are considered tied and the first
+    of them is returned, which is what max(enumerate(values)) does on
+    the igraph vertex sequence, where vertices keep their relative order.
+    """
+
+    vmax = values.max()
+    return int(np.argmax(values >= vmax - rtol*abs(vmax) - atol))
+
+def liveArgmax(mg, values, nodes=None):
+    """ (MaskedGraph, np.array, np.array) -> int
+
+    Original index of the live node (restricted to 'nodes' if given)
+    with the largest value in the length-N array 'values'. Ties go to
+    the smallest original index, see argmaxFirst.
+    """
+
+    if nodes is None:
+        nodes = mg.aliveNodes()
+    return int(nodes[argmaxFirst(np.asarray(values)[nodes])])
+
+
+class MaskedGraph:
+    """ Undirected graph stored as an immutable CSR adjacency plus an
+    'alive' mask and the live degree of each node.
+
+    Nodes keep their original indices for the whole attack: removing a
+    node only clears its mask entry and decrements the degree of its
+    live neighbours, so it costs O(deg) and nothing is relabeled.
+
+    >>> mg = MaskedGraph.fromEdges(4, np.array([(0, 1), (1, 2), (2, 3)]))
+    >>> nbrs = mg.removeNode(1)
+    >>> mg.degree().tolist(), mg.vcount()
+    ([0, 0, 1, 1], 3)
+    """
+
+    def __init__(self, indptr, indices):
+        self.N = len(indptr) - 1
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.indptr.setflags(write=False)
+        self.indices.setflags(write=False)
+        self.alive = np.ones(self.N, dtype=bool)
+        self.deg = np.diff(self.indptr)
+        self.n_alive = self.N
+
+    @classmethod
+    def fromEdges(cls, N, edges):
+        indptr, indices = buildCSR(N, edges)
+        return cls(indptr, indices)
+
+    @classmethod
+    def fromIgraph(cls, graph):
+        """ Builds the masked graph of a simple undirected iGraph.Graph().
+        Node i is vertex i of 'graph'.
+        """
+        N, edges = getEdgeArray(graph)
+        return cls.fromEdges(N, edges)
+
+    def copy(self):
+        """ Returns a copy sharing the (read-only) CSR arrays. """
+        mg = MaskedGraph.__new__(MaskedGraph)
+        mg.N = self.N
+        mg.indptr = self.indptr
+        mg.indices = self.indices
+        mg.alive = self.alive.copy()
+        mg.deg = self.deg.copy()
+        mg.n_alive = self.n_alive
+        return mg
+
+    def vcount(self):
+        return self.n_alive
+
+    def aliveNodes(self):
+        """ Original indices of the live nodes, in increasing order. """
+        return np.flatnonzero(self.alive)
+
+    def neighbors(self, v):
+        """ Live neighbours of node v. """
+        nbrs = self.indices[self.indptr[v]:self.indptr[v+1]]
+        return nbrs[self.alive[nbrs]]
+
+    def degree(self):
+        """ Live degree of every node (0 for removed nodes). Read-only view. """
+        view = self.deg.view()
+        view.setflags(write=False)
+        return view
+
+    def removeNode(self, v):
+        """ Removes node v in O(deg(v)) and returns its live neighbours. """
+        if not self.alive[v]:
+            raise ValueError('Node {} was already removed'.format(v))
+        nbrs = self.neighbors(v)
+        self.deg[nbrs] -= 1
+        self.deg[v] = 0
+        self.alive[v] = False
+        self.n_alive -= 1
+        return nbrs
+
+    def removeNodes(self, nodes):
+        for v in nodes:
+            self.removeNode(v)
+
+    def toNumpy(self):
+        """ Zero-copy export of the masked view as a dict of arrays.
+        The CSR arrays are read-only; 'alive' and 'degree' are views of
+        the live state and must not be modified by the caller.
+        """
+        return {
+            'indptr': self.indptr,
+            'indices': self.indices,
+            'alive': self.alive.view(),
+            'degree': self.degree()
+        }
+
+    def liveEdges(self):
+        """ Returns (src, dst) arrays with both directions of every live edge. """
+        src = np.repeat(np.arange(self.N), np.diff(self.indptr))
+        mask = self.alive[src] & self.alive[self.indices]
+        return src[mask], self.indices[mask]
+
+    def components(self):
+        """ (None) -> (int, np.array)
+
+        Returns the number of live components and the component label of
+        every node. Removed nodes get label -1.
+        """
+        src, dst = self.liveEdges()
+        adj = csr_matrix((np.ones(len(src), dtype=np.int8), (src, dst)),
+                         shape=(self.N, self.N))
+        _, labels = connected_components(adj, directed=False)
+        labels = labels.astype(np.int64)
+        labels[~self.alive] = -1
+        _, labels[self.alive] = np.unique(labels[self.alive], return_inverse=True)
+        n_comp = labels.max() + 1 if self.n_alive else 0
+        return n_comp, labels
+
+    def componentSizes(self):
+        """ Sizes of the live components, indexed by component label. """
+        n_comp, labels = self.components()
+        return np.bincount(labels[labels >= 0], minlength=n_comp)
+
+    def giant(self):
+        """ Original indices of the nodes in the largest live component. """
+        n_comp, labels = self.components()
+        if not n_comp:
+            return np.array([], dtype=np.int64)
+        sizes = np.bincount(labels[labels >= 0])
+        return np.flatnonzero(labels == np.argmax(sizes))
+
+    def inducedEdges(self, nodes=None):
+        """ (np.array) -> (np.array, np.array)
+
+        Returns the sorted node array and the (k, 2) array of live edges
+        among 'nodes' (all live nodes by default) in local indices, i.e.
+        positions in the sorted node array, each edge once. Only the
+        adjacency of 'nodes' is scanned.
+        """
+        if nodes is None:
+            nodes = self.aliveNodes()
+            src, dst = self.liveEdges()
+        else:
+            nodes = np.sort(np.asarray(nodes, dtype=np.int64))
+            src, dst = expandFrontier(self.indptr, self.indices, nodes)
+            mask = self.alive[src] & self.alive[dst]
+            src, dst = src[mask], dst[mask]
+        if not len(nodes):
+            return nodes, np.zeros((0, 2), dtype=np.int64)
+        mask = src < dst
+        src, dst = src[mask], dst[mask]
+        pos_src = np.searchsorted(nodes, src)
+        pos_dst = np.minimum(np.searchsorted(nodes, dst), len(nodes) - 1)
+        mask = nodes[pos_dst] == dst
+        edges = np.array([pos_src[mask], pos_dst[mask]]).T
+        return nodes, edges
+
+    def subgraph(self, nodes=None):
+        """ (np.array) -> (iGraph.Graph(), np.array)
+
+        Returns the live subgraph induced by 'nodes' (all live nodes by
+        default) as an iGraph.Graph() together with the original index
+        of each of its vertices, which are kept in increasing order.
+        """
+        nodes, edges = self.inducedEdges(nodes)
+        return ig.Graph(n=len(nodes), edges=edges.tolist()), nodes
+
+    def adjacency(self, nodes=None):
+        """ (np.array) -> (scipy.sparse.csr_matrix, np.array)
+
+        Same as subgraph, but returns the symmetric adjacency matrix of
+        the induced live subgraph.
+        """
+        nodes, edges = self.inducedEdges(nodes)
+        n = len(nodes)
+        rows = np.concatenate((edges[:,0], edges[:,1]))
+        cols = np.concatenate((edges[:,1], edges[:,0]))
+        adj = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+        return adj, nodes
+
+    def igraphBetweenness(self, nodes=None):
+        """ (np.array) -> np.array
+
+        Betweenness of the live subgraph induced by 'nodes' computed
+        with igraph's C implementation, as a length-N array indexed by
+        original index (0 outside 'nodes').
+        """
+        sub, nodes = self.subgraph(nodes)
+        btw = np.zeros(self.N)
+        btw[nodes] = sub.betweenness(directed=False)
+        return btw
+
+    def betweenness(self, sources=None):
+        """ (np.array) -> np.array
+
+        Brandes betweenness on the live subgraph, with the same
+        normalization as g.betweenness(directed=False). BFS frontiers are
+        expanded level by level with NumPy.
+
+        If 'sources' is given only their shortest-path trees are added,
+        which is exact for every node of a component whose nodes are all
+        in 'sources'.
+        """
+        if sources is None:
+            sources = self.aliveNodes()
+        btw = np.zeros(self.N)
+        dist = np.full(self.N, -1, dtype=np.int64)
+        sigma = np.zeros(self.N)
+        delta = np.zeros(self.N)
+        for s in sources:
+            visited = singleSourceDependencies(self, s, dist, sigma, delta)
+            btw[visited] += delta[visited]
+            btw[s] -= delta[s]
+            dist[visited] = -1
+            sigma[visited] = 0.
+            delta[visited] = 0.
+        return btw / 2.
+
+
+def singleSourceDependencies(mg, s, dist, sigma, delta, target_weight=None):
+    """ (MaskedGraph, int, np.array, np.array, np.array, np.array) -> np.array
+
+    Brandes' single-source stage from s on the live subgraph of 'mg'.
+    Fills 'dist', 'sigma' and the dependencies 'delta' (which must come
+    in reset to -1, 0 and 0) and returns the visited nodes so the caller
+    can reset them in O(visited).
+
+    If 'target_weight' is given, the pair (s, t) counts target_weight[t]
+    times in 'delta' instead of once.
+    """
+
+    indptr, indices, alive = mg.indptr, mg.indices, mg.alive
+    dist[s] = 0
+    sigma[s] = 1.
+    frontier = np.array([s])
+    levels = [frontier]
+    dag_edges = []
+    d = 0
+    while True:
+        src, dst = expandFrontier(indptr, indices, frontier)
+        mask = alive[dst]
+        src, dst = src[mask], dst[mask]
+        new = dst[dist[dst] < 0]
+        if not len(new):
+            break
+        new = np.unique(new)
+        dist[new] = d + 1
+        mask = dist[dst] == d + 1
+        src, dst = src[mask], dst[mask]
+        np.add.at(sigma, dst, sigma[src])
+        dag_edges.append((src, dst))
+        levels.append(new)
+        frontier = new
+        d += 1
+
+    for src, dst in reversed(dag_edges):
+        if target_weight is None:
+            weight = 1.
+        else:
+            weight = target_weight[dst]
+        np.add.at(delta, src, sigma[src] / sigma[dst] * (weight + delta[dst]))
+
+    return np.concatenate(levels)
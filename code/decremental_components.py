@@ -0,0 +1,297 @@
+import heapq
+import numpy as np
+from collections import Counter, deque
+
+
+class DecrementalComponents:
+    """ Connected components of a masked graph under node removals.
+
+    Each live node carries a component label and each component keeps
+    its members in an array with a position map, so a node leaves its
+    component in O(1) and a uniform member is drawn in O(1). When node v
+    is removed, one BFS per live neighbour of v is run, interleaved one
+    node at a time. Searches that meet are merged, and as soon as at
+    most one of them is still running, the finished ones are exactly
+    the pieces that broke off. Only those are relabeled: the cost of a
+    split is O(deg(v) x size of the smaller pieces), while the largest
+    piece keeps the old label without being visited.
+
+    Sizes go into a lazy max-heap and a size histogram, so the giant
+    component (ties to the one holding the smallest node, as in
+    MaskedGraph.giant), the second largest size and the component size
+    distribution are available without any full scan.
+
+    >>> from csr_graph import MaskedGraph
+    >>> mg = MaskedGraph.fromEdges(6, np.array([(0, 1), (1, 2), (2, 3), (3, 4), (4, 5)]))
+    >>> dc = DecrementalComponents(mg)
+    >>> dc.removeNode(2)
+    >>> dc.giantSize(), dc.secondSize(), dc.giantNodes().tolist()
+    (3, 2, [3, 4, 5])
+    """
+
+    def __init__(self, mg):
+        self.mg = mg
+        self.indptr = mg.indptr.tolist()
+        self.indices = mg.indices.tolist()
+        self.alive = mg.alive.tolist()
+
+        n_comp, labels = mg.components()
+        self.labels = labels
+        self.pos = [0]*mg.N
+        self.members = {}
+        alive = mg.aliveNodes()
+        order = alive[np.argsort(labels[alive], kind='stable')]
+        bounds = np.searchsorted(labels[order], np.arange(n_comp+1))
+        for c in range(n_comp):
+            nodes = order[bounds[c]:bounds[c+1]].tolist()
+            self.members[c] = nodes
+            for i, v in enumerate(nodes):
+                self.pos[v] = i
+        self.n_labels = n_comp
+        self.ns = Counter(len(nodes) for nodes in self.members.values())
+        self.heap = [(-len(nodes), c) for c, nodes in self.members.items()]
+        heapq.heapify(self.heap)
+        self._top = None
+        self._sorted = {}
+        self.last_pieces = []
+        self.ties = {}
+
+    def copy(self, mg):
+        """ Copy of the structure on 'mg', which must be a copy of self.mg. """
+        dc = DecrementalComponents.__new__(DecrementalComponents)
+        dc.mg = mg
+        dc.indptr = self.indptr
+        dc.indices = self.indices
+        dc.alive = list(self.alive)
+        dc.labels = self.labels.copy()
+        dc.pos = list(self.pos)
+        dc.members = {c: list(nodes) for c, nodes in self.members.items()}
+        dc.n_labels = self.n_labels
+        dc.ns = Counter(self.ns)
+        dc.heap = list(self.heap)
+        dc._top = self._top
+        dc._sorted = dict(self._sorted)
+        dc.last_pieces = []
+        dc.ties = {s: list(heap) for s, heap in self.ties.items()}
+        return dc
+
+    def _detach(self, v):
+        """ Takes v out of the member array of its component. """
+        self._sorted.pop(self.labels[v], None)
+        nodes = self.members[self.labels[v]]
+        i = self.pos[v]
+        last = nodes.pop()
+        if last != v:
+            nodes[i] = last
+            self.pos[last] = i
+
+    def _resize(self, c, old_size):
+        """ Updates the histogram and the heap after component c changed
+        size (it is dropped if empty).
+        """
+        self.ns[old_size] -= 1
+        if not self.ns[old_size]:
+            del self.ns[old_size]
+        size = len(self.members[c])
+        if size:
+            self.ns[size] += 1
+            heapq.heappush(self.heap, (-size, c))
+            self._pushTie(c)
+        else:
+            del self.members[c]
+
+    def _split(self, sources):
+        """ Interleaved BFS from 'sources'. Returns the node lists of the
+        pieces to relabel, i.e. all of them but one running piece or, if
+        every search ended, but the largest one.
+        """
+        k = len(sources)
+        parent = list(range(k))
+        owner = {}
+        queues = {}
+        visited = {}
+        for i, w in enumerate(sources):
+            owner[w] = i
+            queues[i] = deque([w])
+            visited[i] = [w]
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        indptr, indices, alive = self.indptr, self.indices, self.alive
+        active = list(range(k))
+        finished = []
+        while len(active) > 1:
+            still_active = []
+            for r in active:
+                r = find(r)
+                if r not in queues or r in still_active:
+                    continue
+                u = queues[r].popleft()
+                for w in indices[indptr[u]:indptr[u+1]]:
+                    if not alive[w]:
+                        continue
+                    o = owner.get(w)
+                    if o is None:
+                        owner[w] = r
+                        queues[r].append(w)
+                        visited[r].append(w)
+                        continue
+                    o = find(o)
+                    if o == r:
+                        continue
+                    ## Both searches are in the same piece: merge them
+                    if len(visited[o]) > len(visited[r]):
+                        o, r = r, o
+                    parent[o] = r
+                    queues[r].extend(queues.pop(o))
+                    visited[r].extend(visited.pop(o))
+                    if o in still_active:
+                        still_active.remove(o)
+                if queues[r]:
+                    if r not in still_active:
+                        still_active.append(r)
+                else:
+                    finished.append(visited[r])
+                    del queues[r]
+            active = still_active
+
+        if not active:
+            finished.sort(key=len)
+            finished.pop()
+        return finished
+
+    def removeNode(self, v):
+        """ Updates the components after the removal of node v, which is
+        also removed from the masked graph if it is still alive there.
+        The node lists of the pieces that got a new label are kept in
+        'last_pieces'.
+        """
+        if self.mg.alive[v]:
+            self.mg.removeNode(v)
+        c = self.labels[v]
+        size = len(self.members[c])
+        self._detach(v)
+        self.labels[v] = -1
+        self.alive[v] = False
+        self._top = None
+
+        nbrs = [w for w in self.indices[self.indptr[v]:self.indptr[v+1]]
+                if self.alive[w]]
+        pieces = self._split(nbrs) if len(nbrs) > 1 else []
+        self.last_pieces = pieces
+        for piece in pieces:
+            new = self.n_labels
+            self.n_labels += 1
+            for w in piece:
+                self._detach(w)
+            self.members[new] = piece
+            for i, w in enumerate(piece):
+                self.pos[w] = i
+            self.labels[piece] = new
+            self.ns[len(piece)] += 1
+            heapq.heappush(self.heap, (-len(piece), new))
+            self._pushTie(new)
+        self._resize(c, size)
+
+    def _pushTie(self, c):
+        """ Adds component c to the tie heap of its size, if there is one. """
+        size = len(self.members[c])
+        if size in self.ties:
+            heapq.heappush(self.ties[size], (min(self.members[c]), c))
+
+    def _tieHeap(self, size):
+        """ Heap of (smallest node, label) of the components of 'size',
+        built from the main heap the first time that size is tied at
+        the top and then kept up to date by _pushTie. Components only
+        lose nodes, so an entry is valid while its size is unchanged.
+        """
+        if size not in self.ties:
+            for s in [s for s in self.ties if s > size]:
+                del self.ties[s]
+            entries = []
+            while self.heap and -self.heap[0][0] == size:
+                s, c = heapq.heappop(self.heap)
+                if c in self.members and len(self.members[c]) == size:
+                    entries.append((s, c))
+            for item in entries:
+                heapq.heappush(self.heap, item)
+            self.ties[size] = [(min(self.members[c]), c) for s, c in entries]
+            heapq.heapify(self.ties[size])
+        heap = self.ties[size]
+        while heap:
+            c = heap[0][1]
+            if c in self.members and len(self.members[c]) == size:
+                break
+            heapq.heappop(heap)
+        return heap
+
+    def _validTop(self):
+        """ Drops stale entries from the top of the main heap. """
+        while self.heap:
+            s, c = self.heap[0]
+            if c in self.members and len(self.members[c]) == -s:
+                return
+            heapq.heappop(self.heap)
+
+    def _largest(self):
+        """ Returns (giant label, giant size, second size). """
+        if self._top is not None:
+            return self._top
+        self._validTop()
+        if not self.heap:
+            self._top = (-1, 0, 0)
+            return self._top
+        size = -self.heap[0][0]
+        if self.ns[size] > 1:
+            ## Ties go to the component holding the smallest node
+            giant = self._tieHeap(size)[0][1]
+            second = size
+        else:
+            item = heapq.heappop(self.heap)
+            giant = item[1]
+            self._validTop()
+            second = -self.heap[0][0] if self.heap else 0
+            heapq.heappush(self.heap, item)
+        self._top = (giant, size, second)
+        return self._top
+
+    def giantLabel(self):
+        return self._largest()[0]
+
+    def giantSize(self):
+        return self._largest()[1]
+
+    def secondSize(self):
+        return self._largest()[2]
+
+    def inGiant(self, v):
+        return self.labels[v] == self.giantLabel()
+
+    def giantNodes(self):
+        """ Original indices of the giant component, in increasing order,
+        sorted from its member array in O(G log G) and cached until the
+        component loses a node.
+        """
+        giant = self.giantLabel()
+        if giant < 0:
+            return np.array([], dtype=np.int64)
+        if giant not in self._sorted:
+            self._sorted[giant] = np.sort(np.array(self.members[giant], dtype=np.int64))
+        return self._sorted[giant]
+
+    def sampleGiant(self, rng=np.random):
+        """ Uniformly random node of the giant component in O(1), using
+        rng.randint (np.random by default).
+        """
+        nodes = self.members[self.giantLabel()]
+        return nodes[rng.randint(len(nodes))]
+
+    def sizeHistogram(self):
+        """ (s, n_s) array sorted by decreasing s, as in
+        componentSizes.pickle.bz2.
+        """
+        return np.array(sorted(self.ns.items(), reverse=True), dtype=int)
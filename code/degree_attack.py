@@ -0,0 +1,197 @@
+import heapq
+import random
+import numpy as np
+
+from decremental_components import DecrementalComponents
+
+
+class BucketQueue:
+    """ Max-priority queue over nodes with small integer keys (the
+    live degrees), stored as one bucket per key value.
+
+    Keys may only decrease, as degrees do during an attack, so the
+    pointer to the largest non-empty bucket only moves down and every
+    update costs O(1) ('random') or O(log) ('first').
+
+    Tie-breaking among nodes with the largest key:
+        'first':  smallest node index. Buckets are lazy heaps, stale
+                  entries are dropped when they reach the top.
+        'random': uniformly at random, using random.Random(seed)
+                  ('seed' may also be a random.Random instance).
+                  Buckets are arrays with a position map.
+
+    >>> bq = BucketQueue([1, 3, 3, 0])
+    >>> bq.pop(), bq.pop(), bq.pop(), bq.pop()
+    (1, 2, 0, 3)
+    """
+
+    def __init__(self, keys, tie_break='first', seed=None):
+        if tie_break not in ['first', 'random']:
+            raise ValueError('Tie-break "{}" is not supported'.format(tie_break))
+        self.tie_break = tie_break
+        self.key = [int(k) for k in keys]
+        self.N = len(self.key)
+        self.present = [True]*self.N
+        self.size = self.N
+        self.max_key = max(self.key) if self.N else -1
+        self.buckets = [[] for _ in range(self.max_key+1)]
+        for v, k in enumerate(self.key):
+            self.buckets[k].append(v)
+        self.rng = None
+        if tie_break == 'random':
+            if isinstance(seed, random.Random):
+                self.rng = seed
+            else:
+                self.rng = random.Random(seed)
+            self.pos = [0]*self.N
+            for bucket in self.buckets:
+                for i, v in enumerate(bucket):
+                    self.pos[v] = i
+
+    def __len__(self):
+        return self.size
+
+    def _detach(self, v):
+        """ Takes v out of its bucket ('random' mode only). """
+        bucket = self.buckets[self.key[v]]
+        i = self.pos[v]
+        last = bucket.pop()
+        if last != v:
+            bucket[i] = last
+            self.pos[last] = i
+
+    def decrement(self, v):
+        """ Decreases the key of node v by one. """
+        if not self.present[v]:
+            return
+        if self.tie_break == 'random':
+            self._detach(v)
+            self.key[v] -= 1
+            bucket = self.buckets[self.key[v]]
+            self.pos[v] = len(bucket)
+            bucket.append(v)
+        else:
+            self.key[v] -= 1
+            heapq.heappush(self.buckets[self.key[v]], v)
+
+    def remove(self, v):
+        """ Removes node v from the queue. """
+        if not self.present[v]:
+            return
+        if self.tie_break == 'random':
+            self._detach(v)
+        self.present[v] = False
+        self.size -= 1
+
+    def restore(self, v):
+        """ Puts back node v, taken out with remove(), with the key it
+        had then.
+        """
+        if self.present[v]:
+            return
+        k = self.key[v]
+        if self.tie_break == 'random':
+            bucket = self.buckets[k]
+            self.pos[v] = len(bucket)
+            bucket.append(v)
+        else:
+            heapq.heappush(self.buckets[k], v)
+        self.max_key = max(self.max_key, k)
+        self.present[v] = True
+        self.size += 1
+
+    def top(self):
+        """ Returns (without removing it) a node with the largest key. """
+        while self.max_key >= 0:
+            bucket = self.buckets[self.max_key]
+            if self.tie_break == 'random':
+                if bucket:
+                    return bucket[self.rng.randrange(len(bucket))]
+            else:
+                while bucket:
+                    v = bucket[0]
+                    if self.present[v] and self.key[v] == self.max_key:
+                        return v
+                    heapq.heappop(bucket)
+            self.max_key -= 1
+        raise IndexError('top from an empty BucketQueue')
+
+    def pop(self):
+        """ Removes and returns a node with the largest key. """
+        v = self.top()
+        self.remove(v)
+        return v
+
+
+def degreeAttack(mg, tie_break='first', seed=None, followGiant=False):
+    """ (MaskedGraph, str, int, bool) -> list
+
+    Adaptive degree attack (DegU, or DegGU if 'followGiant') on the
+    masked graph 'mg', which is modified in place. Returns the original
+    indices of the live nodes in removal order. Each removal updates the
+    bucket queue in O(deg), so the whole DegU order costs O(N + M).
+
+    With tie_break='first' the order is identical to the one of
+    updateAttack(centrality='degree') and centralityUpdateAttack.
+
+    In followGiant mode only nodes of the current giant component are
+    attacked and the attack stops when it has less than two nodes, as
+    in centralityUpdateAttack. The giant component is tracked with
+    DecrementalComponents. When it splits, only the nodes of the pieces
+    that broke off leave the queue, at a cost of O(their size). Their
+    keys stay valid, since none of their neighbours is removed while
+    they are cut off, so when one of those components becomes the giant
+    its nodes are put back in O(its size) and the nodes left in the old
+    giant leave the queue.
+
+    >>> from csr_graph import MaskedGraph
+    >>> edges = np.array([(0, 1), (0, 2), (0, 3), (3, 4), (4, 5)])
+    >>> degreeAttack(MaskedGraph.fromEdges(6, edges))
+    [0, 4, 1, 2, 3, 5]
+    """
+
+    deg = np.where(mg.alive, mg.degree(), 0)
+    if followGiant:
+        dc = DecrementalComponents(mg)
+        bq = _restrictedQueue(deg, dc.giantNodes(), tie_break, seed)
+    else:
+        bq = _restrictedQueue(deg, mg.aliveNodes(), tie_break, seed)
+
+    original_indices = []
+    while len(bq):
+        if followGiant and dc.giantSize() < 2:
+            break
+        v = bq.pop()
+        for u in mg.neighbors(v):
+            bq.decrement(u)
+        original_indices.append(int(v))
+        if followGiant:
+            giant, n_gcc = dc.giantLabel(), dc.giantSize()
+            dc.removeNode(v)
+            if dc.giantLabel() != giant:
+                ## Another component is now the giant: swap the members
+                for u in dc.members.get(giant, []):
+                    bq.remove(u)
+                for piece in dc.last_pieces:
+                    for u in piece:
+                        bq.remove(u)
+                for u in dc.members.get(dc.giantLabel(), []):
+                    bq.restore(u)
+            elif dc.giantSize() != n_gcc - 1:
+                ## Pieces broke off the giant component, which kept its label
+                for piece in dc.last_pieces:
+                    for u in piece:
+                        bq.remove(u)
+        else:
+            mg.removeNode(v)
+
+    return original_indices
+
+def _restrictedQueue(deg, nodes, tie_break, seed):
+    """ BucketQueue holding only 'nodes', with keys 'deg'. """
+    bq = BucketQueue(deg, tie_break=tie_break, seed=seed)
+    keep = np.zeros(len(deg), dtype=bool)
+    keep[nodes] = True
+    for v in np.flatnonzero(~keep):
+        bq.remove(v)
+    return bq
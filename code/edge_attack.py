@@ -0,0 +1,186 @@
+import os
+import igraph as ig
+import numpy as np
+
+from csr_graph import argmaxFirst
+from percolation import expandFrontier, getEdgeArray, percolateBonds
+
+
+def buildEdgeAttackPrefix(centrality, update=False):
+    """ (str, bool) -> str
+    Returns the directory prefix of an edge attack.
+
+    >>> buildEdgeAttackPrefix('betweenness', True)
+    'EdgeBtwU'
+    >>> buildEdgeAttackPrefix('random')
+    'EdgeRan'
+    """
+
+    if centrality == 'betweenness':
+        prefix = 'EdgeBtw'
+    elif centrality == 'random':
+        prefix = 'EdgeRan'
+
+    if update and centrality != 'random':
+        prefix += 'U'
+
+    return prefix
+
+def edgeBetweennessOrder(g):
+    """ (iGraph.Graph()) -> np.array
+
+    Static ordering: edge indices of 'g' by decreasing edge betweenness,
+    ties to the smallest index.
+    """
+
+    btw = np.array(g.edge_betweenness(directed=False))
+    return np.argsort(-btw, kind='stable')
+
+def edgeCSR(N, edges):
+    """ (int, np.array) -> (np.array, np.array)
+
+    Returns the CSR adjacency (indptr, eids) of the undirected graph
+    with N nodes and edge list 'edges', where each slot holds the index
+    (row of 'edges') of the edge instead of the neighbour, so that
+    expandFrontier(indptr, eids, nodes) lists the edges of 'nodes'.
+
+    >>> indptr, eids = edgeCSR(3, np.array([(0, 1), (1, 2)]))
+    >>> indptr.tolist(), eids.tolist()
+    ([0, 1, 3, 4], [0, 1, 0, 1])
+    """
+
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    M = len(edges)
+    src = np.concatenate((edges[:,0], edges[:,1]))
+    order = np.argsort(src, kind='stable')
+    eids = np.concatenate((np.arange(M), np.arange(M)))[order]
+    indptr = np.zeros(N+1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=N), out=indptr[1:])
+    return indptr, eids
+
+def adaptiveEdgeBetweennessOrder(g):
+    """ (iGraph.Graph()) -> np.array
+
+    Adaptive ordering: repeatedly removes the edge of largest current
+    edge betweenness (ties to the smallest original index, see
+    argmaxFirst) and returns the original edge indices in removal
+    order.
+
+    Edges are never re-indexed: they live in an edge-id CSR (see
+    edgeCSR) with an alive mask, and each node carries the label of its
+    component, as in betweenness.ComponentBetweenness. Removing an edge
+    only changes the betweenness inside its component, so only the live
+    edges of that component are gathered and igraph's edge_betweenness
+    reruns on them, which also gives the one or two pieces it is left
+    in. The values of every other edge are kept.
+
+    >>> import igraph as ig
+    >>> g = ig.Graph(n=5, edges=[(0, 1), (1, 2), (2, 0), (2, 3), (3, 4)])
+    >>> adaptiveEdgeBetweennessOrder(g).tolist()
+    [3, 0, 1, 2, 4]
+    """
+
+    N, edges = getEdgeArray(g)
+    M = len(edges)
+    indptr, eids = edgeCSR(N, edges)
+    alive = np.ones(M, dtype=bool)
+    btw = np.full(M, -np.inf)
+    labels = np.zeros(N, dtype=np.int64)
+    members = {}
+    local = np.zeros(N, dtype=np.int64)
+
+    def recompute(nodes):
+        ## Edge betweenness and pieces of the live subgraph on 'nodes'
+        _, sub_eids = expandFrontier(indptr, eids, nodes)
+        sub_eids = np.unique(sub_eids[alive[sub_eids]])
+        local[nodes] = np.arange(len(nodes))
+        sub = ig.Graph(n=len(nodes), edges=local[edges[sub_eids]].tolist())
+        if len(sub_eids):
+            btw[sub_eids] = sub.edge_betweenness(directed=False)
+        membership = np.array(sub.components().membership)
+        order = np.argsort(membership, kind='stable')
+        bounds = np.searchsorted(membership[order], np.arange(membership.max()+2))
+        return [nodes[order[bounds[c]:bounds[c+1]]] for c in range(len(bounds) - 1)]
+
+    n_labels = 0
+    pieces = recompute(np.arange(N))
+    order = []
+    while True:
+        for piece in pieces:
+            labels[piece] = n_labels
+            members[n_labels] = piece
+            n_labels += 1
+        if len(order) == M:
+            break
+        e = argmaxFirst(btw)
+        order.append(e)
+        alive[e] = False
+        btw[e] = -np.inf
+        pieces = recompute(members.pop(labels[edges[e,0]]))
+
+    return np.array(order, dtype=np.int64)
+
+def edgeAttack(graph, data_dir, net_name, centrality='random', update=False,
+               overwrite=False):
+    """ (iGraph.Graph(), str, str, str, bool, bool) -> np.array
+
+    Edge-removal (bond percolation) attack on the giant component of
+    'graph', with random, static edge betweenness or adaptive
+    (update=True) edge betweenness ordering. In the directory
+    '<prefix>/' of 'data_dir' (see buildEdgeAttackPrefix) it writes the
+    removed edges as 'oi_edges_<net_name>.txt', one 'u v' pair of
+    vertex indices of the giant component per line, and the
+    observables of percolateBonds as 'comp_data_<net_name>.txt', with
+    the columns and format of get_components.py but one row per removed
+    edge (M rows instead of N), which create_edge_csv.py aggregates
+    over seeds. Returns the edge order.
+    """
+
+    if centrality not in ['random', 'betweenness']:
+        print('ERROR: centrality "', centrality, '" is not supported')
+        return None
+
+    output_dir = os.path.join(data_dir, buildEdgeAttackPrefix(centrality, update))
+    if not os.path.exists(output_dir):
+        os.mkdir(output_dir)
+
+    output_file = os.path.join(output_dir, 'oi_edges_' + net_name + '.txt')
+    components_file = os.path.join(output_dir, 'comp_data_' + net_name + '.txt')
+    if os.path.isfile(output_file):
+        if overwrite:
+            print('Removing file "' + output_file)
+            os.remove(output_file)
+        else:
+            return None
+
+    ## Create a copy of graph so as not to modify the original
+    g = graph.copy()
+
+    if not g.is_simple():
+        print('Network "' + net_name + '" will be considered as simple.')
+        g.simplify()
+
+    if g.is_directed():
+        print('Network "' + net_name + '" will be considered as undirected.')
+        g.to_undirected()
+
+    if not g.is_connected():
+        print('Only giant component of network "' + net_name + '" will be considered.')
+        components = g.components(mode='weak')
+        g = components.giant()
+
+    N, edges = getEdgeArray(g)
+    if centrality == 'random':
+        edge_order = np.arange(len(edges))
+        np.random.shuffle(edge_order)
+    elif update:
+        edge_order = adaptiveEdgeBetweennessOrder(g)
+    else:
+        edge_order = edgeBetweennessOrder(g)
+
+    perc_data = percolateBonds(N, edges, edge_order)
+    data = np.array([perc_data['Ngcc'], perc_data['Nsec'],
+                     perc_data['meanS'], perc_data['meanS2']]).T
+    np.savetxt(components_file, data, fmt='%d %d %f %f')
+    np.savetxt(output_file, edges[edge_order], fmt='%d %d')
+    return edge_order
@@ -0,0 +1,79 @@
+import numpy as np
+import os
+import sys
+import pandas as pd
+
+from percolation import giantEdges, ensemblePercolation, ensembleAverage
+
+net_type = sys.argv[1]
+size = int(sys.argv[2])
+param = sys.argv[3]
+min_seed = int(sys.argv[4])
+max_seed = int(sys.argv[5])
+attack = sys.argv[6]
+
+if 'overwrite' in sys.argv:
+    overwrite = True
+else:
+    overwrite = False
+
+dir_name = os.path.join('../networks', net_type)
+
+seeds = range(min_seed, max_seed)
+
+if net_type == 'ER':
+    N = size
+    p = param
+    base_net_name = 'ER_N{}_p{}'.format(N, p)
+elif net_type == 'BA':
+    N = size
+    m = param
+    base_net_name = 'BA_N{}_m{}'.format(N, m)
+elif net_type == 'Lattice':
+    L = size
+    N = L*L
+    p = param
+    base_net_name = 'Lattice_L{}_f{}'.format(L, p)
+
+## Same outputs as get_components.py followed by create_csv.py, but
+## all the seeds are percolated together by ensemblePercolation
+data = {}
+graphs = []
+oi_lists = []
+pending = []
+for seed in seeds:
+
+    net_name = base_net_name + '_{:05d}'.format(seed)
+    net_dir_name = os.path.join(dir_name, base_net_name, net_name)
+    full_input_name = os.path.join(net_dir_name, net_name + '.txt')
+    data_dir = os.path.join(net_dir_name, attack)
+
+    oi_file = os.path.join(data_dir, 'oi_list_' + net_name + '.txt')
+    if not os.path.isfile(oi_file):
+        if overwrite:
+            print("FILE " + oi_file + " NOT FOUND")
+        continue
+
+    components_file = os.path.join(data_dir, 'comp_data_' + net_name + '.txt')
+    if not overwrite and os.path.isfile(components_file):
+        aux = np.loadtxt(components_file, dtype=float, ndmin=2)
+        data[seed] = {'Ngcc': aux[:,0], 'Nsec': aux[:,1],
+                      'meanS': aux[:,2], 'meanS2': aux[:,3]}
+        continue
+
+    edges = np.loadtxt(full_input_name, dtype=np.int64, ndmin=2)
+    graphs.append(giantEdges(edges.max()+1 if len(edges) else 0, edges))
+    oi_lists.append(np.loadtxt(oi_file, dtype=int, ndmin=1))
+    pending.append((seed, components_file))
+
+print('Percolating {} networks'.format(len(pending)))
+for (seed, components_file), perc_data in zip(pending, ensemblePercolation(graphs, oi_lists)):
+    data[seed] = perc_data
+    comp_data = np.array([perc_data['Ngcc'], perc_data['Nsec'],
+                          perc_data['meanS'], perc_data['meanS2']]).T
+    np.savetxt(components_file, comp_data, fmt='%d %d %f %f')
+
+if data:
+    csv_file_name = os.path.join(dir_name, base_net_name, '{}.csv'.format(attack))
+    df = pd.DataFrame(data=ensembleAverage([data[seed] for seed in sorted(data)], N))
+    df.to_csv(csv_file_name)
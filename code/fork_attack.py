@@ -0,0 +1,201 @@
+import os
+import numpy as np
+
+from csr_graph import MaskedGraph
+from degree_attack import degreeAttack
+from betweenness import betweennessTracker
+from decremental_components import DecrementalComponents
+from attacks import buildAttackPrefix
+
+
+class AttackBranch:
+    """ Graph state shared by the attack variants that have made the
+    same choices so far. 'variants' holds their followGiant flags.
+    """
+
+    def __init__(self, mg, cb, dc, variants):
+        self.mg = mg
+        self.cb = cb
+        self.dc = dc
+        self.variants = variants
+
+    def choose(self, followGiant):
+        """ Node the variant would remove next, or None if it is over. """
+        if followGiant:
+            if self.dc.giantSize() < 2:
+                return None
+            nodes = self.dc.giantNodes()
+        else:
+            if not self.mg.vcount():
+                return None
+            nodes = None
+        return self.cb.argmax(nodes)
+
+    def removeNode(self, v):
+        self.cb.removeNode(v)
+        self.dc.removeNode(v)
+
+    def removeNodes(self, nodes):
+        """ Removes 'nodes' with a single update of the betweenness. """
+        self.cb.removeNodes(nodes)
+        for v in nodes:
+            self.dc.removeNode(v)
+
+    def fork(self, variants):
+        """ Copy of the state for 'variants', which leave this branch. """
+        mg = self.mg.copy()
+        cb = self.cb.copy(mg)
+        self.variants = [fg for fg in self.variants if fg not in variants]
+        return AttackBranch(mg, cb, self.dc.copy(mg), variants)
+
+
+def forkedUpdateAttack(graph, data_dir, net_name, centrality='betweenness',
+                       variants=(False, True), overwrite=False, ignore_existing=True,
+                       btw_method='component', btw_params=None):
+    """ (iGraph.Graph(), str, str, str, tuple, bool, bool, str, dict) -> dict
+
+    Runs the adaptive attacks of 'centrality' for the followGiant flags
+    in 'variants' (False: BtwU/DegU, True: BtwGU/DegGU) in lockstep on a
+    single graph state. While every variant picks the same node it is
+    removed once; at the first step where their choices differ the
+    state is copied and each group goes on alone. The common prefix,
+    usually the expensive part of the attack, is thus computed once.
+
+    Each order is written to '<prefix>/oi_list_<net_name>.txt' in
+    'data_dir', as updateAttack does, and is the same as the one of
+    updateAttack (followGiant=False) or centralityUpdateAttack
+    (followGiant=True, stops when the giant component has less than two
+    nodes). Existing files are handled as in updateAttack: removed if
+    'overwrite', else skipped if 'ignore_existing', else taken as the
+    partial order of their variant, which is resumed. A resumed variant
+    first replays its saved prefix (in bulk, with one betweenness update
+    per run of nodes shared by all the variants of a branch) and is
+    forked as soon as its saved choices differ from those of the
+    others. 'btw_method' must be one of the exact trackers, whose state
+    can be copied. Returns the orders keyed by attack prefix.
+
+    Degree attacks are not forked: degree_attack.degreeAttack runs each
+    variant in O(N + M) plus the component updates, so there is no
+    common prefix worth sharing. A partial degree order is resumed by
+    computing the whole order again, which starts with the same prefix.
+    """
+
+    if centrality not in ['degree', 'betweenness']:
+        print('ERROR: centrality "', centrality, '" is not supported')
+        return None
+
+    output_files = {}
+    resume = {}
+    for followGiant in variants:
+        output_dir = os.path.join(data_dir, buildAttackPrefix(centrality, followGiant))
+        if not os.path.exists(output_dir):
+            os.mkdir(output_dir)
+        output_file = os.path.join(output_dir, 'oi_list_' + net_name + '.txt')
+        resume[followGiant] = []
+        if os.path.isfile(output_file):
+            if overwrite:
+                print('Removing file "' + output_file)
+                os.remove(output_file)
+            elif ignore_existing:
+                print('Ignoring file "' + output_file)
+                continue
+            else:
+                resume[followGiant] = np.loadtxt(output_file, dtype='int', ndmin=1).tolist()
+        output_files[followGiant] = output_file
+    if not output_files:
+        return None
+
+    ## Create a copy of graph so as not to modify the original
+    g = graph.copy()
+
+    if not g.is_simple():
+        print('Network "' + net_name + '" will be considered as simple.')
+        g.simplify()
+
+    if g.is_directed():
+        print('Network "' + net_name + '" will be considered as undirected.')
+        g.to_undirected()
+
+    if not g.is_connected():
+        print('Only giant component of network "' + net_name + '" will be considered.')
+        components = g.components(mode='weak')
+        g = components.giant()
+
+    if centrality == 'degree':
+        orders = {}
+        for followGiant, output_file in output_files.items():
+            order = degreeAttack(MaskedGraph.fromIgraph(g), followGiant=followGiant)
+            np.savetxt(output_file, order, fmt='%d')
+            orders[buildAttackPrefix(centrality, followGiant)] = order
+        return orders
+
+    mg = MaskedGraph.fromIgraph(g)
+    cb = betweennessTracker(mg, btw_method, **(btw_params or {}))
+    dc = DecrementalComponents(mg)
+
+    orders = {followGiant: [] for followGiant in output_files}
+    files = {followGiant: open(output_file, 'a' if resume[followGiant] else 'w')
+             for followGiant, output_file in output_files.items()}
+
+    def savedRun(variants):
+        ## Saved nodes that come next for every variant of a branch
+        run = []
+        while True:
+            nexts = set()
+            for followGiant in variants:
+                i = len(orders[followGiant]) + len(run)
+                if i >= len(resume[followGiant]):
+                    return run
+                nexts.add(resume[followGiant][i])
+            if len(nexts) > 1:
+                return run
+            run.append(nexts.pop())
+
+    branches = [AttackBranch(mg, cb, dc, list(output_files))]
+    while branches:
+        branch = branches.pop()
+        while branch.variants:
+            run = savedRun(branch.variants)
+            if run:
+                branch.removeNodes(run)
+                for followGiant in branch.variants:
+                    orders[followGiant].extend(run)
+                continue
+
+            choices = {}
+            for followGiant in branch.variants:
+                i = len(orders[followGiant])
+                if i < len(resume[followGiant]):
+                    v = resume[followGiant][i]
+                else:
+                    v = branch.choose(followGiant)
+                if v is None:
+                    files[followGiant].close()
+                else:
+                    choices.setdefault(v, []).append(followGiant)
+            branch.variants = [fg for fgs in choices.values() for fg in fgs]
+
+            if len(choices) > 1:
+                step = len(orders[branch.variants[0]])
+                print('Attacks ' + ', '.join(
+                      buildAttackPrefix(centrality, fg) for fg in branch.variants) +
+                      ' diverge at step {}'.format(step))
+                for fgs in list(choices.values())[1:]:
+                    branches.append(branch.fork(fgs))
+
+            if not branch.variants:
+                break
+            v = next(iter(choices))
+            branch.removeNode(v)
+            for followGiant in branch.variants:
+                orders[followGiant].append(v)
+                if len(orders[followGiant]) > len(resume[followGiant]):
+                    files[followGiant].write('{}\n'.format(v))
+
+    for f in files.values():
+        f.close()
+    if hasattr(cb, 'close'):
+        cb.close()
+
+    return {buildAttackPrefix(centrality, followGiant): order
+            for followGiant, order in orders.items()}
@@ -2,7 +2,8 @@ import igraph as ig
 import numpy as np
 import os
 import sys
-from collections import Counter
+
+from percolation import percolate
 
 net_type = sys.argv[1]
 size = int(sys.argv[2])
@@ -71,36 +72,9 @@ for seed in seeds:
         components = g.components(mode='weak')
         g = components.giant()
 
-    N0 = g.vcount()
-    g.vs['original_index'] = range(N0)
-
-    data = []
-
-    oi_values = np.loadtxt(oi_file)
-    for oi in oi_values:
-        
-        components = g.components(mode='WEAK')
-        Ngcc = components.giant().vcount()
-        comp_sizes = [len(c) for c in components]
-        comp_sizes.remove(Ngcc)
-        counter = Counter(comp_sizes)
-
-        if comp_sizes:
-            Nsec = np.max(comp_sizes)
-            meanS = np.mean(comp_sizes)
-            numerator = denominator = 0
-            for size, n in counter.items():
-                numerator += n*size*size
-                denominator += n*size
-            meanS2 = numerator / denominator
-        else:
-            Nsec = 0
-            meanS = np.NaN
-            meanS2 = np.NaN
-
-        data.append([Ngcc, Nsec, meanS, meanS2])
-
-        idx = g.vs['original_index'].index(oi)
-        g.vs[idx].delete()
+    oi_values = np.loadtxt(oi_file, dtype=int)
+    perc_data = percolate(g, oi_values)
+    data = np.array([perc_data['Ngcc'], perc_data['Nsec'], 
+                     perc_data['meanS'], perc_data['meanS2']]).T
     
     np.savetxt(components_file, data, fmt='%d %d %f %f')
@@ -0,0 +1,158 @@
+import heapq
+import numpy as np
+
+from decremental_components import DecrementalComponents
+
+
+class CoreTracker:
+    """ Core numbers of the live nodes of a masked graph, maintained
+    under node removals without recomputing the decomposition.
+
+    Removing v lowers the core number of a node by at most one, and
+    only nodes of core K <= core(v) that are connected to a neighbour
+    of v through nodes of core K can be affected. For each such level K
+    the neighbours of v are checked first: a node whose number of live
+    neighbours of core >= K ('cd') drops below K goes down to K-1, and
+    its neighbours of core K are checked in turn. 'cd' is computed the
+    first time a node is reached and then only decremented, so a
+    removal costs O(sum of the degrees of the nodes reached) instead of
+    a new O(M) decomposition.
+
+    Candidates for removal live in a lazy max-heap keyed by (core,
+    degree), ties to the smallest index. Removals are applied to 'mg'
+    as well unless it already lost the node.
+
+    >>> from csr_graph import MaskedGraph
+    >>> edges = np.array([(0, 1), (1, 2), (2, 0), (2, 3), (3, 4)])
+    >>> ct = CoreTracker(MaskedGraph.fromEdges(5, edges))
+    >>> ct.values().tolist(), ct.argmax()
+    ([2, 2, 2, 1, 1], 2)
+    >>> ct.removeNode(0)
+    >>> ct.values().tolist()
+    [0, 1, 1, 1, 1]
+    """
+
+    def __init__(self, mg):
+        self.mg = mg
+        self.indptr = mg.indptr.tolist()
+        self.indices = mg.indices.tolist()
+        self.alive = mg.alive.tolist()
+        self.deg = mg.degree().tolist()
+        core = np.zeros(mg.N, dtype=np.int64)
+        sub, nodes = mg.subgraph()
+        if len(nodes):
+            core[nodes] = sub.coreness()
+        self.core = core.tolist()
+        self.restrict(mg.aliveNodes())
+
+    def _push(self, v):
+        heapq.heappush(self.heap, (-self.core[v], -self.deg[v], v))
+
+    def restrict(self, nodes):
+        """ Makes 'nodes' the only candidates of argmax(). """
+        self.candidate = [False]*self.mg.N
+        self.heap = []
+        for v in np.asarray(nodes).tolist():
+            self.candidate[v] = True
+            self.heap.append((-self.core[v], -self.deg[v], v))
+        heapq.heapify(self.heap)
+
+    def values(self):
+        return np.array(self.core)
+
+    def argmax(self):
+        """ Candidate with the largest (core, degree), ties to the
+        smallest index, or None if there is none.
+        """
+        heap = self.heap
+        while heap:
+            c, k, v = heap[0]
+            if self.candidate[v] and -c == self.core[v] and -k == self.deg[v]:
+                return v
+            heapq.heappop(heap)
+        return None
+
+    def removeNode(self, v):
+        """ Removes node v and updates the core numbers it affects. """
+        indptr, indices, alive = self.indptr, self.indices, self.alive
+        core, deg = self.core, self.deg
+        alive[v] = False
+        self.candidate[v] = False
+        if self.mg.alive[v]:
+            self.mg.removeNode(v)
+
+        nbrs = [w for w in indices[indptr[v]:indptr[v+1]] if alive[w]]
+        for w in nbrs:
+            deg[w] -= 1
+        levels = sorted(set(core[w] for w in nbrs if core[w] <= core[v]))
+        core[v] = 0
+        deg[v] = 0
+
+        changed = set(nbrs)
+        for K in levels:
+            cd = {}
+            stack = [w for w in nbrs if core[w] == K]
+            while stack:
+                x = stack.pop()
+                if core[x] != K:
+                    continue
+                if x not in cd:
+                    cd[x] = sum(1 for y in indices[indptr[x]:indptr[x+1]]
+                                if alive[y] and core[y] >= K)
+                if cd[x] >= K:
+                    continue
+                ## x leaves the K-core
+                core[x] = K - 1
+                changed.add(x)
+                for y in indices[indptr[x]:indptr[x+1]]:
+                    if alive[y] and core[y] == K:
+                        if y in cd:
+                            cd[y] -= 1
+                        stack.append(y)
+
+        for w in changed:
+            if self.candidate[w]:
+                self._push(w)
+
+def coreAttack(mg, followGiant=False):
+    """ (MaskedGraph, bool) -> list
+
+    Adaptive coreness attack (CoreU, or CoreGU if 'followGiant') on the
+    masked graph 'mg', which is modified in place: the node of largest
+    current core number is removed at every step, ties to the larger
+    degree and then to the smallest index. Core numbers are maintained
+    by CoreTracker. Returns the original indices of the removed nodes.
+
+    In followGiant mode only nodes of the current giant component are
+    attacked and the attack stops when it has less than two nodes, as
+    in degreeAttack.
+
+    >>> from csr_graph import MaskedGraph
+    >>> edges = np.array([(0, 1), (1, 2), (2, 0), (2, 3), (3, 4)])
+    >>> coreAttack(MaskedGraph.fromEdges(5, edges))
+    [2, 0, 3, 1, 4]
+    """
+
+    ct = CoreTracker(mg)
+    if followGiant:
+        dc = DecrementalComponents(mg)
+        ct.restrict(dc.giantNodes())
+
+    original_indices = []
+    while True:
+        if followGiant and dc.giantSize() < 2:
+            break
+        v = ct.argmax()
+        if v is None:
+            break
+        original_indices.append(int(v))
+        if followGiant:
+            giant, n_gcc = dc.giantLabel(), dc.giantSize()
+            ct.removeNode(v)
+            dc.removeNode(v)
+            if dc.giantSize() != n_gcc - 1 or dc.giantLabel() != giant:
+                ct.restrict(dc.giantNodes())
+        else:
+            ct.removeNode(v)
+
+    return original_indices
@@ -0,0 +1,320 @@
+import numpy as np
+from array import array
+
+from percolation import findRoot
+
+
+class DilutedLattice:
+    """ L x L square lattice with open boundaries and some bonds removed,
+    without any edge list. Site i sits at (x, y) = (i % L, i // L), as
+    vertex i of ig.Graph().Lattice([L, L], nei=1, circular=False).
+
+    Bonds are two bit-packed arrays over the sites: bit i of 'right'
+    is the bond (i, i+1) and bit i of 'down' the bond (i, i+L). Bits of
+    the last column (right) and of the last row (down) are always zero,
+    so a lattice takes N/4 bytes: 4 MB for L=4096.
+
+    >>> lat = DilutedLattice(3)
+    >>> lat.M, lat.degree().tolist()
+    (12, [2, 3, 2, 3, 4, 3, 2, 3, 2])
+    """
+
+    def __init__(self, L, right=None, down=None):
+        self.L = L
+        self.N = L*L
+        if right is None:
+            full = np.ones(self.N, dtype=bool)
+            right = full.copy()
+            right[L-1::L] = False
+            down = full
+            down[self.N-L:] = False
+            right, down = np.packbits(right), np.packbits(down)
+        self.right = right
+        self.down = down
+        right, down = self.bonds()
+        self.M = int(right.sum() + down.sum())
+
+    def bonds(self):
+        """ (None) -> (np.array, np.array)
+
+        Unpacked bool arrays (right, down) of length N.
+        """
+        return (np.unpackbits(self.right, count=self.N).view(bool),
+                np.unpackbits(self.down, count=self.N).view(bool))
+
+    def degree(self):
+        """ Number of bonds of every site. """
+        right, down = self.bonds()
+        deg = right.astype(np.int64) + down
+        deg[1:] += right[:-1]
+        deg[self.L:] += down[:-self.L]
+        return deg
+
+    def edges(self):
+        """ (M, 2) edge array, for small lattices and igraph checks. """
+        right, down = self.bonds()
+        r = np.flatnonzero(right)
+        d = np.flatnonzero(down)
+        return np.concatenate((np.stack((r, r+1), axis=1), np.stack((d, d+self.L), axis=1)))
+
+def dilutedLattice(L, f, seed=None):
+    """ (int, float, int) -> DilutedLattice
+
+    Square lattice with int(f*M) of its M = 2L(L-1) bonds removed
+    uniformly at random, as net_create.py does for 'Lattice_L{}_f{}'.
+    Bonds are drawn from np.random.default_rng(seed). The removed set is
+    filled with uniform draws until it has the required size (the
+    distinct values of iid uniform draws form a uniform subset), which
+    needs one byte per bond instead of a permutation of all of them.
+    """
+
+    rng = np.random.default_rng(seed)
+    M = 2*L*(L-1)
+    k = int(f*M)
+    ## Draw the smaller of the removed and the kept sets
+    draw = min(k, M - k)
+    chosen = np.zeros(M, dtype=bool)
+    n_chosen = 0
+    while n_chosen < draw:
+        idx = rng.integers(M, size=min(draw - n_chosen, 2**22))
+        chosen[idx] = True
+        n_chosen = int(np.count_nonzero(chosen))
+    present = chosen if draw < k else ~chosen
+
+    ## Bond b < L(L-1) is the right bond of row b // (L-1), the others
+    ## the down bonds of sites b - L(L-1)
+    right = np.zeros(L*L, dtype=bool)
+    right.reshape(L, L)[:,:-1] = present[:L*(L-1)].reshape(L, L-1)
+    down = np.zeros(L*L, dtype=bool)
+    down[:L*(L-1)] = present[L*(L-1):]
+    return DilutedLattice(L, np.packbits(right), np.packbits(down))
+
+def _unionPairs(parent, a, b):
+    """ Vectorized union of the label pairs (a, b), the smaller root
+    becoming the parent. Returns the roots of 'a'.
+    """
+
+    while True:
+        ra = _roots(parent, a)
+        rb = _roots(parent, b)
+        diff = ra != rb
+        if not diff.any():
+            return ra
+        parent[np.maximum(ra, rb)[diff]] = np.minimum(ra, rb)[diff]
+
+def _roots(parent, labels):
+    """ Roots of 'labels', compressing their paths. """
+    roots = parent[labels]
+    while True:
+        up = parent[roots]
+        if (up == roots).all():
+            break
+        roots = up
+    parent[labels] = roots
+    return roots
+
+def latticeComponents(lat, alive=None):
+    """ (DilutedLattice, np.array) -> (int, np.array)
+
+    Hoshen-Kopelman labelling of the sites in 'alive' (all by default),
+    one row at a time: runs joined by right bonds get provisional
+    labels, down bonds to the row above merge them with a vectorized
+    union-find, and a final pass resolves every label. Returns the
+    number of components and the label of every site (-1 for removed
+    sites), components numbered by their smallest site as in
+    MaskedGraph.components().
+
+    >>> lat = DilutedLattice(3)
+    >>> alive = np.ones(9, dtype=bool)
+    >>> alive[[1, 4, 7]] = False
+    >>> latticeComponents(lat, alive)[1].tolist()
+    [0, -1, 1, 0, -1, 1, 0, -1, 1]
+    """
+
+    L, N = lat.L, lat.N
+    if alive is None:
+        alive = np.ones(N, dtype=bool)
+    right, down = lat.bonds()
+    right = (right & alive & np.roll(alive, -1)).reshape(L, L)
+    down = down.copy()
+    down[:N-L] &= alive[:N-L] & alive[L:]
+    down = down.reshape(L, L)
+    alive = alive.reshape(L, L)
+
+    labels = np.full((L, L), -1, dtype=np.int64)
+    parent = np.zeros(N, dtype=np.int64)
+    n_labels = 0
+    for y in range(L):
+        row = alive[y]
+        ## A run starts at every live site not joined to its left
+        start = row.copy()
+        start[1:] &= ~right[y,:-1]
+        run = np.cumsum(start) - 1 + n_labels
+        n_new = int(start.sum())
+        parent[n_labels:n_labels+n_new] = np.arange(n_labels, n_labels+n_new)
+        n_labels += n_new
+        labels[y,row] = run[row]
+        if y:
+            joined = np.flatnonzero(down[y-1])
+            if len(joined):
+                _unionPairs(parent, labels[y,joined], labels[y-1,joined])
+
+    labels = labels.ravel()
+    live = labels >= 0
+    parent = parent[:n_labels]
+    roots = _roots(parent, np.arange(n_labels))
+    ## Roots are the smallest label of each cluster, and labels grow
+    ## with the first site of their run
+    _, labels[live] = np.unique(roots[labels[live]], return_inverse=True)
+    n_comp = labels.max() + 1 if live.any() else 0
+    return n_comp, labels
+
+def latticeGiant(lat, alive=None):
+    """ Sites of the largest component (ties to the one holding the
+    smallest site), as in MaskedGraph.giant().
+    """
+
+    n_comp, labels = latticeComponents(lat, alive)
+    if not n_comp:
+        return np.array([], dtype=np.int64)
+    sizes = np.bincount(labels[labels >= 0])
+    return np.flatnonzero(labels == np.argmax(sizes))
+
+def latticeAttackOrder(lat, nodes, attack='Ran', seed=None):
+    """ (DilutedLattice, np.array, str, int) -> np.array
+
+    Removal order of 'nodes': 'Ran' is a permutation drawn from
+    np.random.default_rng(seed), 'Deg' sorts by decreasing degree in
+    the subgraph of 'nodes' with ties to the smallest site.
+    """
+
+    nodes = np.asarray(nodes, dtype=np.int64)
+    if attack == 'Ran':
+        return np.random.default_rng(seed).permutation(nodes)
+    if attack == 'Deg':
+        alive = np.zeros(lat.N, dtype=bool)
+        alive[nodes] = True
+        right, down = lat.bonds()
+        L = lat.L
+        right = right & alive & np.roll(alive, -1)
+        down = down.copy()
+        down[:lat.N-L] &= alive[:lat.N-L] & alive[L:]
+        deg = right.astype(np.int64) + down
+        deg[1:] += right[:-1]
+        deg[L:] += down[:-L]
+        return nodes[np.argsort(-deg[nodes], kind='stable')]
+    raise ValueError('Unknown lattice attack "{}"'.format(attack))
+
+def latticePercolation(lat, oi_list, nodes=None):
+    """ (DilutedLattice, np.array, np.array) -> dict
+
+    Newman-Ziff percolation of the sites 'nodes' of 'lat' (all by
+    default; other sites are never present) along the removal order
+    'oi_list', with the same outputs as percolateEdges for the graph
+    induced by 'nodes' (N there is len(nodes)). Neighbours are read from
+    the bond bits, so no adjacency is ever built.
+
+    >>> lat = DilutedLattice(2)
+    >>> latticePercolation(lat, [0, 3])['Ngcc'].tolist()
+    [4, 3]
+    """
+
+    L, N = lat.L, lat.N
+    oi_list = np.asarray(oi_list, dtype=np.int64)
+    T = len(oi_list)
+    if len(np.unique(oi_list)) != T:
+        raise ValueError('Removal order contains repeated nodes')
+    if nodes is None:
+        nodes = np.arange(N)
+    n_nodes = len(nodes)
+
+    right, down = lat.bonds()
+    right = right.tobytes()
+    down = down.tobytes()
+
+    EMPTY = -N-1
+    ptr = array('q', [EMPTY])*N
+    ## Cluster size histogram instead of a heap: one entry per size
+    ## rather than per added node keeps L=4096 within memory
+    ns = array('q', [0])*(n_nodes+1)
+    n_present = n_clusters = sum_s2 = 0
+    N1 = N2 = 0
+
+    removed = np.zeros(N, dtype=bool)
+    removed[oi_list] = True
+    considered = np.zeros(N, dtype=bool)
+    considered[nodes] = True
+    addition_order = np.concatenate((np.flatnonzero(considered & ~removed), oi_list[::-1]))
+
+    Ngcc_values = np.zeros(T, dtype=np.int64)
+    Nsec_values = np.zeros(T, dtype=np.int64)
+    meanS_values = np.full(T, np.nan)
+    meanS2_values = np.full(T, np.nan)
+
+    for chunk in range(0, len(addition_order), 2**16):
+        for s1 in addition_order[chunk:chunk+2**16].tolist():
+            r1 = s1
+            ptr[s1] = -1
+            n_present += 1
+            n_clusters += 1
+            sum_s2 += 1
+            ns[1] += 1
+            nbrs = []
+            if s1 and right[s1-1]:
+                nbrs.append(s1-1)
+            if right[s1]:
+                nbrs.append(s1+1)
+            if s1 >= L and down[s1-L]:
+                nbrs.append(s1-L)
+            if down[s1]:
+                nbrs.append(s1+L)
+            for s2 in nbrs:
+                if ptr[s2] == EMPTY:
+                    continue
+                r2 = findRoot(ptr, s2)
+                if r2 == r1:
+                    continue
+                a = -ptr[r1]
+                b = -ptr[r2]
+                ns[a] -= 1
+                ns[b] -= 1
+                ns[a+b] += 1
+                n_clusters -= 1
+                sum_s2 += 2*a*b
+                if a < b:
+                    ptr[r2] -= a
+                    ptr[r1] = r2
+                    r1 = r2
+                else:
+                    ptr[r1] -= b
+                    ptr[r2] = r1
+
+            ## Second largest: the old giant if it survives a new one,
+            ## otherwise scan down to the first size left besides it
+            merged = -ptr[r1]
+            if merged > N1:
+                s = N1 if ns[N1] > 0 else N2
+                N1 = merged
+            else:
+                s = max(N2, merged)
+            while s > 0 and ns[s] - (s == N1) <= 0:
+                s -= 1
+            N2 = s
+
+            t = n_nodes - n_present
+            if t >= T:
+                continue
+
+            Ngcc_values[t] = N1
+            Nsec_values[t] = N2
+            if n_clusters > 1:
+                meanS_values[t] = (n_present - N1) / (n_clusters - 1)
+                meanS2_values[t] = (sum_s2 - N1*N1) / (n_present - N1)
+
+    return {
+        'Ngcc': Ngcc_values,
+        'Nsec': Nsec_values,
+        'meanS': meanS_values,
+        'meanS2': meanS2_values,
+        'R': Ngcc_values.sum() / n_nodes**2 if n_nodes else 0.
+    }
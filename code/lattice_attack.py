@@ -0,0 +1,55 @@
+import numpy as np
+import os
+import sys
+import pathlib
+
+from lattice import dilutedLattice, latticeGiant, latticeAttackOrder, latticePercolation
+
+## Lattice counterpart of net_create.py + net_attack.py + get_components.py:
+## each seed's lattice is generated in memory and never written, and
+## only the components data is saved, in the usual directories.
+L = int(sys.argv[1])
+f = float(sys.argv[2])
+min_seed = int(sys.argv[3])
+max_seed = int(sys.argv[4])
+
+if 'overwrite' in sys.argv:
+    overwrite = True
+else:
+    overwrite = False
+
+attacks = []
+if 'Ran' in sys.argv:
+    attacks.append('Ran')
+if 'Deg' in sys.argv:
+    attacks.append('Deg')
+
+dir_name = os.path.join('../networks', 'Lattice')
+base_net_name = 'Lattice_L{}_f{}'.format(L, f)
+
+for seed in range(min_seed, max_seed):
+
+    net_name = base_net_name + '_{:05d}'.format(seed)
+    net_dir_name = os.path.join(dir_name, base_net_name, net_name)
+
+    ## Independent streams for the dilution and the random order
+    lattice_seed, order_seed = np.random.SeedSequence(seed).spawn(2)
+
+    lat = None
+    for attack in attacks:
+        data_dir = os.path.join(net_dir_name, attack)
+        components_file = os.path.join(data_dir, 'comp_data_' + net_name + '.txt')
+        if not overwrite:
+            if os.path.isfile(components_file):
+                continue
+        pathlib.Path(data_dir).mkdir(parents=True, exist_ok=True)
+        print(net_name, attack)
+
+        if lat is None:
+            lat = dilutedLattice(L, f, seed=lattice_seed)
+            giant = latticeGiant(lat)
+        oi_list = latticeAttackOrder(lat, giant, attack, seed=order_seed)
+        perc_data = latticePercolation(lat, oi_list, giant)
+        data = np.array([perc_data['Ngcc'], perc_data['Nsec'],
+                         perc_data['meanS'], perc_data['meanS2']]).T
+        np.savetxt(components_file, data, fmt='%d %d %f %f')
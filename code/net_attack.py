@@ -2,7 +2,11 @@ import igraph as ig
 import os
 import sys
 
-from attacks import updateAttack, nonUpdateAttack
+from attacks import updateAttack
+from static_attack import STATIC_PREFIXES, staticAttacks
+from fork_attack import forkedUpdateAttack
+from edge_attack import edgeAttack
+from reinsertion import reinsertionAttack
 
 net_type = sys.argv[1]
 size = int(sys.argv[2])
@@ -30,20 +34,54 @@ if 'DegU' in sys.argv:
 else:
     DegU = False
 
-if 'Btw' in sys.argv:
-    Btw = True
+if 'BtwGU' in sys.argv:
+    BtwGU = True
 else:
-    Btw = False
+    BtwGU = False
 
-if 'Deg' in sys.argv:
-    Deg = True
+if 'DegGU' in sys.argv:
+    DegGU = True
 else:
-    Deg = False
+    DegGU = False
 
-if 'Ran' in sys.argv:
-    Ran = True
+## Non-adaptive attacks, all computed in one call
+static_attacks = []
+for centrality, prefix in STATIC_PREFIXES.items():
+    if prefix in sys.argv:
+        static_attacks.append(centrality)
+
+if 'CIU' in sys.argv:
+    CIU = True
+else:
+    CIU = False
+
+if 'CoreU' in sys.argv:
+    CoreU = True
+else:
+    CoreU = False
+
+if 'EigU' in sys.argv:
+    EigU = True
+else:
+    EigU = False
+
+if 'PRU' in sys.argv:
+    PRU = True
 else:
-    Ran = False
+    PRU = False
+
+if 'reinsert' in sys.argv:
+    reinsert = True
+else:
+    reinsert = False
+
+edge_attacks = []
+if 'EdgeRan' in sys.argv:
+    edge_attacks.append(('random', False))
+if 'EdgeBtw' in sys.argv:
+    edge_attacks.append(('betweenness', False))
+if 'EdgeBtwU' in sys.argv:
+    edge_attacks.append(('betweenness', True))
 
 dir_name = os.path.join('../networks', net_type)
 
@@ -72,23 +110,54 @@ for seed in seeds:
 
     G = ig.Graph().Read_Edgelist(full_name, directed=False)        
 
-    if DegU:
+    ## Variants restricted to the giant component share the prefix
+    ## they have in common with DegU and BtwU
+    if DegGU:
+        variants = (False, True) if DegU else (True,)
+        forkedUpdateAttack(G, net_dir_name, output_name[:-4], centrality='degree',
+                           variants=variants, overwrite=overwrite,
+                           ignore_existing=ignore_existing)
+    elif DegU:
         updateAttack(G, net_dir_name, output_name[:-4], centrality='degree', 
                      overwrite=overwrite, ignore_existing=ignore_existing)
 
-    if BtwU:
+    if BtwGU:
+        variants = (False, True) if BtwU else (True,)
+        forkedUpdateAttack(G, net_dir_name, output_name[:-4], centrality='betweenness',
+                           variants=variants, overwrite=overwrite,
+                           ignore_existing=ignore_existing)
+    elif BtwU:
         updateAttack(G, net_dir_name, output_name[:-4], centrality='betweenness', 
                      overwrite=overwrite, ignore_existing=ignore_existing)
 
-    if Ran:
-        nonUpdateAttack(G, net_dir_name, output_name[:-4], centrality='random', 
+    if CIU:
+        updateAttack(G, net_dir_name, output_name[:-4], centrality='ci',
                      overwrite=overwrite, ignore_existing=ignore_existing)
 
-    if Deg:
-        nonUpdateAttack(G, net_dir_name, output_name[:-4], centrality='degree', 
-                        overwrite=overwrite, ignore_existing=ignore_existing)
+    if CoreU:
+        updateAttack(G, net_dir_name, output_name[:-4], centrality='coreness',
+                     overwrite=overwrite, ignore_existing=ignore_existing)
 
-    if Btw:
-        nonUpdateAttack(G, net_dir_name, output_name[:-4], centrality='betweenness', 
-                        overwrite=overwrite, ignore_existing=ignore_existing)
+    if EigU:
+        updateAttack(G, net_dir_name, output_name[:-4], centrality='eigenvector',
+                     overwrite=overwrite, ignore_existing=ignore_existing)
+
+    if PRU:
+        updateAttack(G, net_dir_name, output_name[:-4], centrality='pagerank',
+                     overwrite=overwrite, ignore_existing=ignore_existing)
 
+    if static_attacks:
+        staticAttacks(G, net_dir_name, output_name[:-4], static_attacks,
+                      overwrite=overwrite)
+
+    for centrality, update in edge_attacks:
+        edgeAttack(G, net_dir_name, output_name[:-4], centrality=centrality,
+                   update=update, overwrite=overwrite)
+
+    ## Greedy reinsertion on top of the adaptive attacks just computed
+    if reinsert:
+        for attack, selected in [('BtwU', BtwU), ('DegU', DegU), ('CIU', CIU),
+                                 ('CoreU', CoreU), ('EigU', EigU), ('PRU', PRU)]:
+            if selected:
+                reinsertionAttack(G, net_dir_name, output_name[:-4], attack,
+                                  overwrite=overwrite)
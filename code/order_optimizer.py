@@ -0,0 +1,367 @@
+import os
+import math
+import time
+import random
+from array import array
+import numpy as np
+
+from percolation import getEdgeArray, buildCSR, percolateEdges
+
+
+class OrderRobustness:
+    """ Robustness area R = sum_t Ngcc(t) / N^2 of a removal order that
+    can be re-evaluated after a local change without replaying the whole
+    percolation.
+
+    The giant components come from a reverse union-find: nodes are added
+    from the end of the order, and since the largest cluster can only
+    grow, Ngcc(t) is the running maximum of the merged cluster sizes.
+    Rewriting positions i..j of the order leaves the set of nodes
+    present at t <= i and at t > j untouched, so only Ngcc(t) for
+    i < t <= j changes. Snapshots of the union-find are kept every
+    'step' positions (about N/n_snapshots). A change is evaluated by
+    replaying from the first snapshot after j down to i+1, in place and
+    with an undo log, so it costs O(j - i + step) unions and leaves the
+    snapshot as it was.
+
+    Nodes missing from 'order' are appended to it in index order, so the
+    order always covers the N nodes.
+
+    >>> edges = np.array([(0, 1), (1, 2), (2, 3), (3, 4)])
+    >>> orb = OrderRobustness(5, edges, [0, 1, 2, 3, 4])
+    >>> orb.Ngcc.tolist(), orb.R()
+    ([5, 4, 3, 2, 1], 0.6)
+    >>> orb.evaluate(0, 2, [2, 1, 0])
+    -3
+    >>> orb.apply(0, 2, [2, 1, 0])
+    >>> orb.order, orb.Ngcc.tolist()
+    ([2, 1, 0, 3, 4], [5, 2, 2, 2, 1])
+    """
+
+    def __init__(self, N, edges, order, n_snapshots=64):
+        self.N = N
+        indptr, indices = buildCSR(N, edges)
+        self.indptr = indptr.tolist()
+        self.indices = indices.tolist()
+        self.EMPTY = -N-1
+
+        order = [int(v) for v in order]
+        if len(set(order)) != len(order):
+            raise ValueError('Removal order contains repeated nodes')
+        listed = np.zeros(N, dtype=bool)
+        listed[order] = True
+        self.order = order + np.flatnonzero(~listed).tolist()
+
+        self.step = max(1, -(-N // n_snapshots))
+        self.snapshots = {}
+        self.Ngcc = np.zeros(N, dtype=np.int64)
+
+        ## Full reverse pass, storing the union-find every 'step' positions
+        ptr = array('q', [self.EMPTY])*N
+        giant = 0
+        self.snapshots[N] = (array('q', ptr), 0)
+        for t in range(N-1, -1, -1):
+            giant = max(giant, self._add(ptr, self.order[t], None))
+            self.Ngcc[t] = giant
+            if t % self.step == 0:
+                self.snapshots[t] = (array('q', ptr), giant)
+        self.total = int(self.Ngcc.sum())
+
+    def R(self):
+        return self.total / self.N**2 if self.N else 0.
+
+    def _add(self, ptr, s1, log):
+        """ Adds node s1 to the union-find 'ptr' and returns the size of
+        its cluster. Every write is recorded in 'log' if given. Finds do
+        not compress paths, union by size keeps them O(log N).
+        """
+
+        EMPTY, indices = self.EMPTY, self.indices
+        if log is not None:
+            log.append((s1, ptr[s1]))
+        ptr[s1] = -1
+        r1 = s1
+        for idx in range(self.indptr[s1], self.indptr[s1+1]):
+            r2 = indices[idx]
+            if ptr[r2] == EMPTY:
+                continue
+            while ptr[r2] >= 0:
+                r2 = ptr[r2]
+            if r2 == r1:
+                continue
+            if ptr[r1] > ptr[r2]:
+                r1, r2 = r2, r1
+            if log is not None:
+                log.append((r1, ptr[r1]))
+                log.append((r2, ptr[r2]))
+            ptr[r1] += ptr[r2]
+            ptr[r2] = r1
+        return -ptr[r1]
+
+    def _replay(self, i, j, segment, commit):
+        """ New Ngcc(t), i < t <= j, with positions i..j of the order
+        replaced by 'segment'. If 'commit', the snapshots in that range
+        are replaced by the new ones.
+        """
+
+        order = self.order
+        c = min(self.N, -(-(j+1) // self.step) * self.step)
+        ptr, giant = self.snapshots[c]
+        log = []
+        values = [0]*(j - i)
+        for t in range(c-1, i, -1):
+            v = segment[t-i] if t <= j else order[t]
+            giant = max(giant, self._add(ptr, v, log))
+            if t <= j:
+                values[t-i-1] = giant
+                if commit and t % self.step == 0:
+                    self.snapshots[t] = (array('q', ptr), giant)
+        for v, old in reversed(log):
+            ptr[v] = old
+        return values
+
+    def evaluate(self, i, j, segment):
+        """ (int, int, list) -> int
+
+        Change of sum_t Ngcc(t) (R times N^2) if positions i..j of the
+        order were replaced by 'segment', a permutation of them.
+        """
+
+        if j <= i:
+            return 0
+        values = self._replay(i, j, segment, False)
+        return sum(values) - int(self.Ngcc[i+1:j+1].sum())
+
+    def apply(self, i, j, segment):
+        """ Replaces positions i..j of the order by 'segment'. """
+
+        if j > i:
+            values = self._replay(i, j, segment, True)
+            self.total += sum(values) - int(self.Ngcc[i+1:j+1].sum())
+            self.Ngcc[i+1:j+1] = values
+        self.order[i:j+1] = segment
+
+def _randomMove(rng, order, n_active, max_span):
+    """ Random local move (i, j, segment) on the first n_active
+    positions: a swap of the ends of order[i..j] or a rotation of that
+    block, which shifts part of it past the rest.
+    """
+
+    i = rng.randrange(n_active)
+    j = min(len(order) - 1, i + rng.randint(1, max_span))
+    segment = order[i:j+1]
+    if rng.random() < 0.5 or len(segment) < 3:
+        segment[0], segment[-1] = segment[-1], segment[0]
+    else:
+        k = rng.randint(1, len(segment) - 1)
+        segment = segment[k:] + segment[:k]
+    return i, j, segment
+
+def optimizeOrder(N, edges, oi_list, time_budget=60., method='anneal', seed=0,
+                  max_iter=None, max_span=20, T0=None, T1=None, n_candidates=20,
+                  tenure=50, n_snapshots=64, checkpoint=None, checkpoint_interval=60.):
+    """ (int, np.array, list, float, str, int, int, int, ...) -> dict
+
+    Improves the removal order 'oi_list' of the graph with N nodes and
+    edge list 'edges', minimizing the robustness area R, by local moves
+    (swaps and block shifts of at most 'max_span' positions) evaluated
+    incrementally with OrderRobustness. Moves are drawn on the positions
+    where a giant of at least two nodes still exists.
+
+        'anneal': simulated annealing. A move that changes sum_t Ngcc(t)
+                  by d > 0 is accepted with probability exp(-d/T), with
+                  T cooling geometrically from T0 to T1 (by default the
+                  mean |d| of 100 random moves and a thousandth of it).
+        'tabu':   every iteration evaluates 'n_candidates' moves and
+                  applies the best one, even if it is worse. Moves
+                  touching nodes moved in the last 'tenure'
+                  iterations are skipped unless they improve on the
+                  best order found.
+
+    The search stops after 'time_budget' seconds or 'max_iter'
+    iterations. The RNG is seeded with 'seed', and if 'max_iter' is
+    given the cooling follows the iteration count instead of the clock,
+    so a run that is not cut by the budget is reproducible.
+    'checkpoint', if given, is called as checkpoint(order, R) with the
+    best order every 'checkpoint_interval' seconds and at the end.
+
+    Returns a dict with:
+        'oi_list':    best order found (all N nodes).
+        'R':          its robustness area.
+        'R_initial':  robustness area of 'oi_list'.
+        'iterations': iterations done.
+        'accepted':   moves applied.
+
+    >>> edges = np.array([(0, 1), (1, 2), (2, 3), (3, 4)])
+    >>> data = optimizeOrder(5, edges, [0, 1, 2, 3, 4], max_iter=200)
+    >>> data['R_initial'], data['R']
+    (0.6, 0.44)
+    """
+
+    if method not in ['anneal', 'tabu']:
+        raise ValueError('Unknown optimization method "{}"'.format(method))
+    rng = random.Random(seed)
+    orb = OrderRobustness(N, edges, oi_list, n_snapshots)
+    order = orb.order
+    R_initial = orb.R()
+
+    def activePositions():
+        big = np.flatnonzero(orb.Ngcc > 1)
+        return max(1, int(big[-1]) + 1 if len(big) else 1)
+
+    n_active = activePositions()
+
+    ## Moves applied since the best order, undone to recover it
+    best_total = orb.total
+    journal = []
+
+    def bestOrder():
+        best = list(order)
+        for i, j, old in reversed(journal):
+            best[i:j+1] = old
+        return best
+
+    def applyMove(i, j, segment):
+        nonlocal best_total, journal, n_active
+        journal.append((i, j, order[i:j+1]))
+        orb.apply(i, j, segment)
+        if orb.total < best_total:
+            best_total = orb.total
+            journal = []
+        if j >= n_active - 1 or orb.Ngcc[n_active-1] <= 1:
+            n_active = activePositions()
+
+    if method == 'anneal' and T0 is None:
+        deltas = [abs(orb.evaluate(*_randomMove(rng, order, n_active, max_span)))
+                  for _ in range(100)]
+        T0 = max(1., float(np.mean(deltas)))
+    if T1 is None:
+        T1 = T0 * 1e-3 if T0 is not None else None
+
+    tabu_until = {}
+    start = last_checkpoint = time.time()
+    it = accepted = 0
+    while max_iter is None or it < max_iter:
+        now = time.time()
+        elapsed = now - start
+        if elapsed >= time_budget:
+            break
+        if checkpoint is not None and now - last_checkpoint >= checkpoint_interval:
+            checkpoint(bestOrder(), best_total / N**2)
+            last_checkpoint = now
+
+        if method == 'anneal':
+            progress = it / max_iter if max_iter else elapsed / time_budget
+            T = T0 * (T1 / T0)**progress
+            i, j, segment = _randomMove(rng, order, n_active, max_span)
+            delta = orb.evaluate(i, j, segment)
+            if delta <= 0 or rng.random() < math.exp(-delta / T):
+                applyMove(i, j, segment)
+                accepted += 1
+        else:
+            best_move = None
+            for _ in range(n_candidates):
+                i, j, segment = _randomMove(rng, order, n_active, max_span)
+                delta = orb.evaluate(i, j, segment)
+                is_tabu = any(tabu_until.get(v, -1) > it for v in segment)
+                if is_tabu and orb.total + delta >= best_total:
+                    continue
+                if best_move is None or delta < best_move[0]:
+                    best_move = (delta, i, j, segment)
+            if best_move is not None:
+                delta, i, j, segment = best_move
+                applyMove(i, j, segment)
+                accepted += 1
+                for v in segment:
+                    tabu_until[v] = it + tenure
+        it += 1
+
+    best = bestOrder()
+    if checkpoint is not None:
+        checkpoint(best, best_total / N**2)
+
+    return {
+        'oi_list': np.array(best, dtype=np.int64),
+        'R': best_total / N**2 if N else 0.,
+        'R_initial': R_initial,
+        'iterations': it,
+        'accepted': accepted
+    }
+
+def optimizeAttack(graph, data_dir, net_name, attack, time_budget=60., method='anneal',
+                   seed=0, overwrite=False, **params):
+    """ (iGraph.Graph(), str, str, str, float, str, int, bool, ...) -> dict
+
+    Applies optimizeOrder to the order in '<attack>/oi_list_<net_name>.txt'
+    of 'data_dir' (any directory written by updateAttack or
+    nonUpdateAttack, e.g. 'BtwU' or 'Deg') on the giant component of
+    'graph', preprocessed as the attacks do. 'params' go to
+    optimizeOrder.
+
+    The best order is written to '<attack>O/oi_list_<net_name>.txt'
+    every 'checkpoint_interval' seconds and at the end, and its
+    observables to '<attack>O/comp_data_<net_name>.txt', with the
+    columns of get_components.py. If that order already exists and
+    'overwrite' is False the search resumes from it. One line
+    'iterations accepted R_initial R' per run is appended to
+    '<attack>O/opt_log_<net_name>.txt'. Returns the optimization data.
+    """
+
+    oi_file = os.path.join(data_dir, attack, 'oi_list_' + net_name + '.txt')
+    if not os.path.isfile(oi_file):
+        print('FILE ' + oi_file + ' NOT FOUND')
+        return None
+
+    output_dir = os.path.join(data_dir, attack + 'O')
+    if not os.path.exists(output_dir):
+        os.mkdir(output_dir)
+    output_file = os.path.join(output_dir, 'oi_list_' + net_name + '.txt')
+    log_file = os.path.join(output_dir, 'opt_log_' + net_name + '.txt')
+    if os.path.isfile(output_file):
+        if overwrite:
+            print('Removing file "' + output_file)
+            os.remove(output_file)
+            if os.path.isfile(log_file):
+                os.remove(log_file)
+        else:
+            print('Resuming from "' + output_file)
+            oi_file = output_file
+
+    ## Create a copy of graph so as not to modify the original
+    g = graph.copy()
+
+    if not g.is_simple():
+        print('Network "' + net_name + '" will be considered as simple.')
+        g.simplify()
+
+    if g.is_directed():
+        print('Network "' + net_name + '" will be considered as undirected.')
+        g.to_undirected()
+
+    if not g.is_connected():
+        print('Only giant component of network "' + net_name + '" will be considered.')
+        components = g.components(mode='weak')
+        g = components.giant()
+
+    def checkpoint(order, R):
+        ## Written aside and renamed, so an interrupted run keeps a valid file
+        tmp_file = output_file + '.tmp'
+        np.savetxt(tmp_file, order, fmt='%d')
+        os.replace(tmp_file, output_file)
+
+    N, edges = getEdgeArray(g)
+    oi_list = np.loadtxt(oi_file, dtype=int, ndmin=1)
+    data = optimizeOrder(N, edges, oi_list, time_budget, method, seed,
+                         checkpoint=checkpoint, **params)
+    print('Robustness of "{}" reduced from {:.6f} to {:.6f}'.format(
+          net_name, data['R_initial'], data['R']))
+
+    perc_data = percolateEdges(N, edges, data['oi_list'])
+    comp_data = np.array([perc_data['Ngcc'], perc_data['Nsec'],
+                          perc_data['meanS'], perc_data['meanS2']]).T
+    np.savetxt(os.path.join(output_dir, 'comp_data_' + net_name + '.txt'),
+               comp_data, fmt='%d %d %f %f')
+    with open(log_file, 'a') as f:
+        f.write('{} {} {:f} {:f}\n'.format(data['iterations'], data['accepted'],
+                                           data['R_initial'], data['R']))
+    return data
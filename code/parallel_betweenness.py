@@ -0,0 +1,145 @@
+import weakref
+import numpy as np
+import igraph as ig
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+from csr_graph import MaskedGraph, singleSourceDependencies
+
+
+## State of a worker process, set once by _initWorker
+_worker = {}
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _initWorker(specs):
+    """ Attaches a worker to the shared CSR, alive mask and accumulator
+    and allocates its Brandes work arrays, once per attack.
+    """
+    arrays = {}
+    for key, (name, shape, dtype) in specs.items():
+        shm, arr = _attach(name, shape, dtype)
+        _worker[key + '_shm'] = shm
+        arrays[key] = arr
+    mg = MaskedGraph(arrays['indptr'], arrays['indices'])
+    mg.alive = arrays['alive']
+    N = mg.N
+    _worker['mg'] = mg
+    _worker['acc'] = arrays['acc']
+    _worker['dist'] = np.full(N, -1, dtype=np.int64)
+    _worker['sigma'] = np.zeros(N)
+    _worker['delta'] = np.zeros(N)
+
+def igraphHasSources():
+    """ True if this igraph computes betweenness from a subset of
+    sources (python-igraph >= 0.10).
+    """
+    try:
+        ig.Graph(n=2).betweenness(sources=[0])
+    except TypeError:
+        return False
+    return True
+
+def _accumulate(task):
+    """ Adds the dependencies of 'sources' (part of the live
+    components 'nodes') into row 'row' of the shared accumulator, which
+    no other task writes. Runs igraph's C Brandes restricted to the
+    sources when available, the NumPy one otherwise.
+    """
+    row, nodes, sources, use_igraph = task
+    mg, acc = _worker['mg'], _worker['acc'][row]
+    acc[:] = 0.
+    if use_igraph:
+        sub, nodes = mg.subgraph(nodes)
+        local = np.searchsorted(nodes, sources).tolist()
+        acc[nodes] = 2*np.array(sub.betweenness(directed=False, sources=local))
+        return row
+
+    dist, sigma, delta = _worker['dist'], _worker['sigma'], _worker['delta']
+    for s in sources:
+        visited = singleSourceDependencies(mg, s, dist, sigma, delta)
+        acc[visited] += delta[visited]
+        acc[s] -= delta[s]
+        dist[visited] = -1
+        sigma[visited] = 0.
+        delta[visited] = 0.
+    return row
+
+def _release(pool, blocks):
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+
+class ParallelBetweenness:
+    """ Multi-process Brandes kernel for the betweenness trackers.
+
+    The CSR adjacency of 'mg' is copied once into shared memory, together
+    with an alive mask and an (n_workers, N) dependency accumulator. The
+    pool is started once and kept for the whole attack: a call only
+    copies the current alive mask, sends every worker its share of the
+    sources (interleaved, for load balance) and sums the accumulator
+    rows, each of them written by a single task. Workers run igraph's
+    Brandes restricted to their sources if igraph supports it, and the
+    NumPy one on the shared CSR otherwise.
+
+    Components with less than 'min_nodes' nodes are computed in the
+    calling process with igraph, where the pool overhead is not worth it.
+
+    Use as kernel=ParallelBetweenness(mg, n_workers) and call close()
+    (or let it be garbage collected) to stop the pool and free the
+    shared memory.
+    """
+
+    def __init__(self, mg, n_workers=None, min_nodes=2000):
+        if n_workers is None:
+            n_workers = mp.cpu_count()
+        self.N = mg.N
+        self.n_workers = n_workers
+        self.min_nodes = min_nodes
+        self.n_parallel_calls = 0
+        self.use_igraph = igraphHasSources()
+
+        self.blocks = []
+        specs = {}
+        arrays = {
+            'indptr': mg.indptr,
+            'indices': mg.indices,
+            'alive': mg.alive,
+            'acc': np.zeros((n_workers, self.N))
+        }
+        for key, arr in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            self.blocks.append(shm)
+            view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+            view[...] = arr
+            setattr(self, key, view)
+            specs[key] = (shm.name, arr.shape, arr.dtype)
+
+        self.pool = mp.Pool(n_workers, initializer=_initWorker, initargs=(specs,))
+        self._finalizer = weakref.finalize(self, _release, self.pool, self.blocks)
+
+    def __call__(self, mg, nodes):
+        """ (MaskedGraph, np.array) -> np.array
+
+        Betweenness of the live subgraph induced by 'nodes' (a union of
+        live components) as a length-N array.
+        """
+        if len(nodes) < self.min_nodes:
+            return mg.igraphBetweenness(nodes)
+
+        self.alive[:] = mg.alive
+        tasks = [(i, nodes, nodes[i::self.n_workers], self.use_igraph)
+                 for i in range(self.n_workers)]
+        rows = self.pool.map(_accumulate, tasks)
+        self.n_parallel_calls += 1
+        return self.acc[rows].sum(axis=0) / 2.
+
+    def close(self):
+        """ Stops the pool and frees the shared memory. """
+        self._finalizer()
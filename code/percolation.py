@@ -0,0 +1,713 @@
+import heapq
+import numpy as np
+from scipy.special import gammaln, xlogy, xlog1py
+
+
+def getEdgeArray(graph):
+    """ (iGraph.Graph()) -> (int, np.array)
+
+    Returns the number of nodes of 'graph' and its edge list as an
+    integer array of shape (M, 2).
+    """
+
+    N = graph.vcount()
+    edges = np.array(graph.get_edgelist(), dtype=np.int64).reshape(-1, 2)
+    return N, edges
+
+def buildCSR(N, edges):
+    """ (int, np.array) -> (np.array, np.array)
+
+    Returns the CSR adjacency (indptr, indices) of the undirected graph
+    with N nodes and edge list 'edges'. Self-loops are dropped.
+
+    >>> indptr, indices = buildCSR(3, np.array([(0, 1), (1, 2)]))
+    >>> indptr.tolist(), indices.tolist()
+    ([0, 1, 3, 4], [1, 2, 0, 1])
+    """
+
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    edges = edges[edges[:,0] != edges[:,1]]
+    src = np.concatenate((edges[:,0], edges[:,1]))
+    dst = np.concatenate((edges[:,1], edges[:,0]))
+    order = np.argsort(src, kind='stable')
+    indices = dst[order]
+    indptr = np.zeros(N+1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=N), out=indptr[1:])
+    return indptr, indices
+
+def expandFrontier(indptr, indices, frontier):
+    """ (np.array, np.array, np.array) -> (np.array, np.array)
+
+    Returns the arrays (src, dst) with one entry per adjacency of the
+    nodes in 'frontier', without any Python loop over nodes.
+
+    >>> indptr, indices = buildCSR(3, np.array([(0, 1), (1, 2)]))
+    >>> src, dst = expandFrontier(indptr, indices, np.array([0, 1]))
+    >>> src.tolist(), dst.tolist()
+    ([0, 1, 1], [1, 2, 0])
+    """
+
+    starts = indptr[frontier]
+    counts = indptr[frontier+1] - starts
+    total = counts.sum()
+    src = np.repeat(frontier, counts)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    dst = indices[offsets + np.arange(total)]
+    return src, dst
+
+def findRoot(ptr, i):
+    """ (list, int) -> int
+
+    Returns the root of node i in the union-find 'ptr', where roots
+    store minus the size of their cluster. Paths are halved on the way.
+    """
+
+    while ptr[i] >= 0:
+        j = ptr[i]
+        if ptr[j] >= 0:
+            ptr[i] = ptr[j]
+        i = j
+    return i
+
+def _validTop(heap, ptr, k=2):
+    """ Returns the sizes of the k largest clusters, dropping stale
+    entries of the lazy heap of (-size, root) pairs.
+    """
+
+    valid = []
+    while heap and len(valid) < k:
+        s, r = heap[0]
+        if ptr[r] != s:
+            heapq.heappop(heap)
+            continue
+        valid.append(heapq.heappop(heap))
+    for item in valid:
+        heapq.heappush(heap, item)
+    sizes = [-s for s, r in valid]
+    return sizes + [0]*(k-len(sizes))
+
+def percolateEdges(N, edges, oi_list, histogram=False):
+    """ (int, np.array, list, bool) -> dict
+
+    Newman-Ziff percolation for the node removal order 'oi_list' on the
+    graph with N nodes and edge list 'edges'. Nodes are re-added in
+    reverse order and merged with a weighted union-find, as in
+    source/perc_v2.cpp, so the whole curve costs O(M alpha(N)).
+
+    Nodes not present in 'oi_list' are considered never removed. Every
+    output array has one entry per removal step t = 0, ..., len(oi_list)-1
+    and describes the graph with the first t nodes of 'oi_list' removed:
+
+        'Ngcc':   size of the largest component.
+        'Nsec':   size of the second largest component (0 if none).
+        'meanS':  mean size of the finite components (NaN if none).
+        'meanS2': <s> = sum s^2 / sum s over finite components (NaN if none).
+        'R':      robustness area, sum_t Ngcc(t) / N^2.
+        'sizes':  only if 'histogram', list of (s, n_s) arrays sorted
+                  by decreasing s, as in componentSizes.pickle.bz2.
+
+    >>> edges = np.array([(0, 1), (1, 2), (2, 3), (4, 5)])
+    >>> data = percolateEdges(6, edges, [1, 4])
+    >>> data['Ngcc'].tolist(), data['Nsec'].tolist()
+    ([4, 2], [2, 2])
+    """
+
+    oi_list = np.asarray(oi_list, dtype=np.int64)
+    T = len(oi_list)
+    if len(np.unique(oi_list)) != T:
+        raise ValueError('Removal order contains repeated nodes')
+
+    indptr, indices = buildCSR(N, edges)
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+
+    EMPTY = -N-1
+    ptr = [EMPTY]*N
+    heap = []
+    ns = {}
+    n_present = n_clusters = sum_s2 = 0
+
+    removed = np.zeros(N, dtype=bool)
+    removed[oi_list] = True
+    always_present = np.flatnonzero(~removed).tolist()
+    addition_order = always_present + oi_list[::-1].tolist()
+
+    Ngcc_values = np.zeros(T, dtype=np.int64)
+    Nsec_values = np.zeros(T, dtype=np.int64)
+    meanS_values = np.full(T, np.nan)
+    meanS2_values = np.full(T, np.nan)
+    sizes_values = [None]*T
+
+    for s1 in addition_order:
+        r1 = s1
+        ptr[s1] = -1
+        n_present += 1
+        n_clusters += 1
+        sum_s2 += 1
+        ns[1] = ns.get(1, 0) + 1
+        for idx in range(indptr[s1], indptr[s1+1]):
+            s2 = indices[idx]
+            if ptr[s2] == EMPTY:
+                continue
+            r2 = findRoot(ptr, s2)
+            if r2 == r1:
+                continue
+            a = -ptr[r1]
+            b = -ptr[r2]
+            for s in (a, b):
+                ns[s] -= 1
+                if not ns[s]:
+                    del ns[s]
+            ns[a+b] = ns.get(a+b, 0) + 1
+            n_clusters -= 1
+            sum_s2 += 2*a*b
+            if a < b:
+                ptr[r2] -= a
+                ptr[r1] = r2
+                r1 = r2
+            else:
+                ptr[r1] -= b
+                ptr[r2] = r1
+        heapq.heappush(heap, (ptr[r1], r1))
+
+        t = N - n_present
+        if t >= T:
+            continue
+
+        N1, N2 = _validTop(heap, ptr)
+        Ngcc_values[t] = N1
+        Nsec_values[t] = N2
+        if n_clusters > 1:
+            meanS_values[t] = (n_present - N1) / (n_clusters - 1)
+            meanS2_values[t] = (sum_s2 - N1*N1) / (n_present - N1)
+        if histogram:
+            sizes_values[t] = np.array(sorted(ns.items(), reverse=True), dtype=int)
+
+    data = {
+        'Ngcc': Ngcc_values,
+        'Nsec': Nsec_values,
+        'meanS': meanS_values,
+        'meanS2': meanS2_values,
+        'R': Ngcc_values.sum() / N**2 if N else 0.
+    }
+    if histogram:
+        data['sizes'] = sizes_values
+
+    return data
+
+def percolate(graph, oi_list, histogram=False):
+    """ (iGraph.Graph(), list, bool) -> dict
+
+    Computes the percolation observables of 'graph' along the removal
+    order 'oi_list' in a single reverse union-find pass. Node labels in
+    'oi_list' are the vertex indices of 'graph'. See percolateEdges.
+    """
+
+    N, edges = getEdgeArray(graph)
+    return percolateEdges(N, edges, oi_list, histogram=histogram)
+
+def percolateBonds(N, edges, edge_order):
+    """ (int, np.array, list) -> dict
+
+    Bond percolation counterpart of percolateEdges: 'edge_order' holds
+    the indices (rows of 'edges') of the removed edges in removal order,
+    and edges not in it are never removed. Nodes are always present and
+    edges are re-added in reverse order with the weighted union-find.
+    Outputs are those of percolateEdges with one entry per removed edge,
+    and 'R' is sum_t Ngcc(t) / (N M) for the M edges of the graph.
+
+    >>> edges = np.array([(0, 1), (1, 2), (2, 3), (3, 0)])
+    >>> data = percolateBonds(4, edges, [0, 2, 1])
+    >>> data['Ngcc'].tolist(), data['Nsec'].tolist()
+    ([4, 4, 2], [0, 0, 2])
+    """
+
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    M = len(edges)
+    edge_order = np.asarray(edge_order, dtype=np.int64)
+    T = len(edge_order)
+    if len(np.unique(edge_order)) != T:
+        raise ValueError('Removal order contains repeated edges')
+
+    ptr = [-1]*N
+    heap = [(-1, i) for i in range(N)]
+    n_clusters = N
+    sum_s2 = N
+
+    removed = np.zeros(M, dtype=bool)
+    removed[edge_order] = True
+    addition_order = np.flatnonzero(~removed).tolist() + edge_order[::-1].tolist()
+    src = edges[:,0].tolist()
+    dst = edges[:,1].tolist()
+
+    Ngcc_values = np.zeros(T, dtype=np.int64)
+    Nsec_values = np.zeros(T, dtype=np.int64)
+    meanS_values = np.full(T, np.nan)
+    meanS2_values = np.full(T, np.nan)
+
+    for n_added, e in enumerate([None] + addition_order):
+        if e is not None:
+            r1 = findRoot(ptr, src[e])
+            r2 = findRoot(ptr, dst[e])
+            if r1 != r2:
+                a = -ptr[r1]
+                b = -ptr[r2]
+                n_clusters -= 1
+                sum_s2 += 2*a*b
+                if a < b:
+                    r1, r2 = r2, r1
+                ptr[r1] -= min(a, b)
+                ptr[r2] = r1
+                heapq.heappush(heap, (ptr[r1], r1))
+
+        ## Step t has the first t edges of 'edge_order' removed
+        t = M - n_added
+        if t >= T:
+            continue
+
+        N1, N2 = _validTop(heap, ptr)
+        Ngcc_values[t] = N1
+        Nsec_values[t] = N2
+        if n_clusters > 1:
+            meanS_values[t] = (N - N1) / (n_clusters - 1)
+            meanS2_values[t] = (sum_s2 - N1*N1) / (N - N1)
+
+    return {
+        'Ngcc': Ngcc_values,
+        'Nsec': Nsec_values,
+        'meanS': meanS_values,
+        'meanS2': meanS2_values,
+        'R': Ngcc_values.sum() / (N*M) if N*M else 0.
+    }
+
+def _momentSummary(sums, counts):
+    """ Turns sums of X^k over realizations into the dict returned by
+    randomPercolation.
+    """
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        moments = sums / counts
+    return {
+        'mean': moments[0],
+        'var': moments[1] - moments[0]**2,
+        'moments': moments,
+        'count': counts
+    }
+
+def _lockstepUnionFind(offsets, n_nodes, additions, expand):
+    """ Reverse union-find of K graphs packed in one node space, run in
+    lockstep. Graph k owns the global ids offsets[k], ...,
+    offsets[k] + n_nodes[k] - 1 and row k of 'additions' lists them in
+    addition order. Rows must be sorted by decreasing n_nodes, so the
+    graphs still growing at step a are the first ones. expand(x)
+    returns the global ids of all the neighbours of the nodes x.
+
+    Yields after every step a: (B, N1, N2, n_clusters, sum_s2), with the
+    arrays restricted to the B graphs that have just added a node.
+    """
+
+    K, A = additions.shape
+    total = offsets[-1] + n_nodes[-1] if K else 0
+    EMPTY = -total-1
+    ptr = np.full(total, EMPTY, dtype=np.int64)
+    hist = np.zeros(K*(A+1), dtype=np.int64)
+    hist_offsets = np.arange(K) * (A+1)
+    N1 = np.zeros(K, dtype=np.int64)
+    N2 = np.zeros(K, dtype=np.int64)
+    sum_s2 = np.zeros(K, dtype=np.int64)
+    n_clusters = np.zeros(K, dtype=np.int64)
+    n_growing = np.searchsorted(-np.asarray(n_nodes), -np.arange(A))
+
+    for a in range(A):
+        B = n_growing[a]
+        x = additions[:B, a]
+        ptr[x] = -1
+
+        ## Live neighbours of the added nodes and their roots
+        nbr = expand(x)
+        nbr = nbr[ptr[nbr] != EMPTY]
+        roots = nbr.copy()
+        while True:
+            parent = ptr[roots]
+            mask = parent >= 0
+            if not mask.any():
+                break
+            roots[mask] = parent[mask]
+        ptr[nbr[nbr != roots]] = roots[nbr != roots]
+        roots = np.unique(roots)
+        roots_k = np.searchsorted(offsets, roots, side='right') - 1
+
+        ## Merge every cluster touched with the new node, attaching
+        ## them to the largest one
+        all_roots = np.concatenate((x, roots))
+        all_k = np.concatenate((np.arange(B), roots_k))
+        sizes = np.concatenate((np.ones(B, dtype=np.int64), -ptr[roots]))
+        merged = np.bincount(all_k, weights=sizes, minlength=B).astype(np.int64)
+        order = np.lexsort((-sizes, all_k))
+        first = order[np.searchsorted(all_k[order], np.arange(B))]
+        new_root = all_roots[first]
+        ptr[all_roots] = new_root[all_k]
+        ptr[new_root] = -merged
+
+        h = hist_offsets[:B]
+        np.subtract.at(hist, hist_offsets[roots_k] + sizes[B:], 1)
+        np.add.at(hist, h + merged, 1)
+        sum_s2[:B] += merged**2 - np.bincount(roots_k, weights=sizes[B:]**2,
+                                              minlength=B).astype(np.int64)
+        n_clusters[:B] += 1 - np.bincount(roots_k, minlength=B)
+
+        ## Second largest: the old giant if it survives a new one,
+        ## otherwise scan down from max(old N2, merged) to the first
+        ## size still present besides the giant
+        old_N1, old_N2 = N1[:B], N2[:B]
+        grown = merged > old_N1
+        s = np.where(grown, np.where(hist[h + old_N1] > 0, old_N1, old_N2),
+                     np.maximum(old_N2, merged))
+        new_N1 = np.maximum(old_N1, merged)
+        present = hist[h + s] - (s == new_N1)
+        while True:
+            mask = (present <= 0) & (s > 0)
+            if not mask.any():
+                break
+            s[mask] -= 1
+            present[mask] = hist[h[mask] + s[mask]] - (s[mask] == new_N1[mask])
+        N1[:B] = new_N1
+        N2[:B] = s
+
+        yield B, N1[:B], N2[:B], n_clusters[:B], sum_s2[:B]
+
+def _clusterMeans(n_present, N1, n_clusters, sum_s2):
+    """ meanS and meanS2 as in percolateEdges (NaN without finite
+    clusters).
+    """
+
+    finite = n_clusters > 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        meanS = np.where(finite, (n_present - N1) / (n_clusters - 1), np.nan)
+        meanS2 = np.where(finite, (sum_s2 - N1**2) / (n_present - N1), np.nan)
+    return meanS, meanS2
+
+def randomPercolation(N, edges, R, seed=None, n_moments=4, block=None):
+    """ (int, np.array, int, int, int, int) -> dict
+
+    Random node removal (Ran) averaged over R uniformly random orders of
+    all N nodes, drawn from np.random.default_rng(seed). The reverse
+    union-find passes of a block of realizations run together: parent
+    and cluster-size histogram arrays are stored realization-major and
+    every step adds one node to each realization with NumPy operations.
+    No order is written anywhere.
+
+    Blocks hold 'block' realizations, by default as many as fit in
+    about 2**24 array entries.
+
+    For each of 'Ngcc', 'Nsec', 'meanS' and 'meanS2' (as in
+    percolateEdges) returns a dict with:
+        'moments': array (n_moments, N), row k-1 is <X^k> at step t.
+        'mean', 'var': mean and variance at step t.
+        'count': realizations where X is defined at step t (meanS and
+                 meanS2 are not defined without finite clusters).
+    'R' holds the same summary for the robustness of each order.
+
+    >>> edges = np.array([(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)])
+    >>> data = randomPercolation(4, edges, 10, seed=0)
+    >>> data['Ngcc']['mean'].tolist(), data['Ngcc']['var'].tolist()
+    ([4.0, 3.0, 2.0, 1.0], [0.0, 0.0, 0.0, 0.0])
+    """
+
+    indptr, indices = buildCSR(N, edges)
+    deg = np.diff(indptr)
+    if block is None:
+        block = max(1, 2**24 // max(N, 1))
+    rng = np.random.default_rng(seed)
+
+    keys = ['Ngcc', 'Nsec', 'meanS', 'meanS2']
+    sums = {key: np.zeros((n_moments, N)) for key in keys}
+    counts = {key: np.zeros(N) for key in keys}
+    R_sums = np.zeros((n_moments, 1))
+    powers = np.arange(1, n_moments+1)[:,None]
+
+    for start in range(0, R, block):
+        B = min(block, R - start)
+        orders = rng.permuted(np.tile(np.arange(N), (B, 1)), axis=1)
+        offsets = np.arange(B) * N
+        additions = offsets[:,None] + orders[:,::-1]
+        area = np.zeros(B)
+
+        def expand(x):
+            base = np.repeat(x - x % N, deg[x % N])
+            return base + expandFrontier(indptr, indices, x % N)[1]
+
+        steps = _lockstepUnionFind(offsets, np.full(B, N), additions, expand)
+        for a, (_, N1, N2, n_clusters, sum_s2) in enumerate(steps):
+            t = N - 1 - a
+            area += N1
+            meanS, meanS2 = _clusterMeans(a + 1, N1, n_clusters, sum_s2)
+            for key, values in zip(keys, [N1, N2, meanS, meanS2]):
+                values = np.asarray(values, dtype=np.float64)
+                values = values[~np.isnan(values)]
+                sums[key][:,t] += (values[None,:]**powers).sum(axis=1)
+                counts[key][t] += len(values)
+
+        R_sums[:,0] += ((area / N**2)[None,:]**powers).sum(axis=1)
+
+    data = {key: _momentSummary(sums[key], counts[key]) for key in keys}
+    data['R'] = _momentSummary(R_sums[:,0], float(R))
+    return data
+
+def randomPercolate(graph, R, seed=None, n_moments=4, block=None):
+    """ (iGraph.Graph(), int, int, int, int) -> dict
+
+    Moments over R random removal orders of 'graph', see
+    randomPercolation.
+    """
+
+    N, edges = getEdgeArray(graph)
+    return randomPercolation(N, edges, R, seed=seed, n_moments=n_moments, block=block)
+
+def giantEdges(N, edges):
+    """ (int, np.array) -> (int, np.array)
+
+    Simple undirected version of the graph with N nodes and edge list
+    'edges', restricted to its largest component and relabeled as
+    igraph does with g.simplify() and g.components().giant(), so that
+    removal orders computed on the igraph giant component apply.
+
+    >>> giantEdges(6, np.array([(0, 1), (1, 0), (2, 3), (3, 4), (4, 4)]))[1].tolist()
+    [[0, 1], [1, 2]]
+    """
+
+    edges = np.sort(np.asarray(edges, dtype=np.int64).reshape(-1, 2), axis=1)
+    edges = np.unique(edges[edges[:,0] != edges[:,1]], axis=0)
+    ## Component labels in order of their smallest node, as igraph
+    ptr = np.arange(N)
+    for u, v in edges.tolist():
+        while ptr[u] != u:
+            u = ptr[u]
+        while ptr[v] != v:
+            v = ptr[v]
+        ptr[max(u, v)] = min(u, v)
+    roots = ptr.copy()
+    while True:
+        parent = roots[roots]
+        if (parent == roots).all():
+            break
+        roots = parent
+    giant = np.argmax(np.bincount(roots, minlength=N))
+    keep = roots == giant
+    labels = np.cumsum(keep) - 1
+    edges = edges[keep[edges[:,0]]]
+    return int(keep.sum()), labels[edges]
+
+def ensemblePercolation(graphs, oi_lists, block=None):
+    """ (list, list, int) -> list
+
+    Percolation of many small graphs at once. 'graphs' holds (N, edges)
+    pairs and 'oi_lists' their removal orders. The graphs of a block
+    are packed into one node space, graph k taking the ids after those
+    of graphs 0, ..., k-1, and all their reverse union-find passes run
+    in a single vectorized loop over the steps. Blocks hold as many
+    graphs as fit in about 'block' nodes (2**22 by default).
+
+    Returns one dict per graph with the 'Ngcc', 'Nsec', 'meanS',
+    'meanS2' and 'R' entries of percolateEdges.
+
+    >>> edges = np.array([(0, 1), (1, 2), (2, 3), (4, 5)])
+    >>> data = ensemblePercolation([(6, edges), (3, edges[:2])], [[1, 4], [2, 0, 1]])
+    >>> data[0]['Ngcc'].tolist(), data[1]['Ngcc'].tolist()
+    ([4, 2], [3, 2, 1])
+    """
+
+    oi_lists = [np.asarray(oi_list, dtype=np.int64) for oi_list in oi_lists]
+    for oi_list in oi_lists:
+        if len(np.unique(oi_list)) != len(oi_list):
+            raise ValueError('Removal order contains repeated nodes')
+    if block is None:
+        block = 2**22
+
+    results = [None]*len(graphs)
+    start = 0
+    while start < len(graphs):
+        ## Graphs of the block, largest first
+        end = start + 1
+        n_block = graphs[start][0]
+        while end < len(graphs) and n_block + graphs[end][0] <= block:
+            n_block += graphs[end][0]
+            end += 1
+        idx = sorted(range(start, end), key=lambda i: -graphs[i][0])
+        start = end
+
+        Ns = np.array([graphs[i][0] for i in idx], dtype=np.int64)
+        Ts = np.array([len(oi_lists[i]) for i in idx], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(Ns)[:-1]))
+        edges = np.concatenate([np.asarray(graphs[i][1], dtype=np.int64).reshape(-1, 2) + off
+                                for i, off in zip(idx, offsets)])
+        indptr, indices = buildCSR(n_block, edges)
+
+        additions = np.zeros((len(idx), Ns[0]), dtype=np.int64)
+        for row, (i, N, off) in enumerate(zip(idx, Ns, offsets)):
+            removed = np.zeros(N, dtype=bool)
+            removed[oi_lists[i]] = True
+            additions[row,:N] = off + np.concatenate((np.flatnonzero(~removed),
+                                                      oi_lists[i][::-1]))
+
+        T_max = max(Ts.max(), 1)
+        Ngcc = np.zeros((len(idx), T_max), dtype=np.int64)
+        Nsec = np.zeros((len(idx), T_max), dtype=np.int64)
+        meanS = np.full((len(idx), T_max), np.nan)
+        meanS2 = np.full((len(idx), T_max), np.nan)
+
+        expand = lambda x: expandFrontier(indptr, indices, x)[1]
+        steps = _lockstepUnionFind(offsets, Ns, additions, expand)
+        for a, (B, N1, N2, n_clusters, sum_s2) in enumerate(steps):
+            t = Ns[:B] - 1 - a
+            rows = np.flatnonzero(t < Ts[:B])
+            if not len(rows):
+                continue
+            t = t[rows]
+            Ngcc[rows,t] = N1[rows]
+            Nsec[rows,t] = N2[rows]
+            mS, mS2 = _clusterMeans(a + 1, N1[rows], n_clusters[rows], sum_s2[rows])
+            meanS[rows,t] = mS
+            meanS2[rows,t] = mS2
+
+        for row, (i, N, T) in enumerate(zip(idx, Ns, Ts)):
+            results[i] = {
+                'Ngcc': Ngcc[row,:T],
+                'Nsec': Nsec[row,:T],
+                'meanS': meanS[row,:T],
+                'meanS2': meanS2[row,:T],
+                'R': Ngcc[row,:T].sum() / N**2 if N else 0.
+            }
+
+    return results
+
+def ensembleAverage(data, N):
+    """ (list, int) -> dict
+
+    Averages over the per-graph results of ensemblePercolation as
+    create_csv.py does: curves are padded with ones up to N steps and
+    the columns 't', 'Sgcc', 'varSgcc', 'Nsec', 'meanS2' and 'binder'
+    are returned, ready for pd.DataFrame.
+    """
+
+    def padded(key):
+        return np.array([np.append(d[key], np.repeat(1, N-len(d[key]))) for d in data],
+                        dtype=np.float64)
+
+    Ngcc_values = padded('Ngcc')
+    return {
+        't': np.arange(N)/N,
+        'Sgcc': np.mean(Ngcc_values, axis=0)/N,
+        'varSgcc': np.var(Ngcc_values, axis=0)/N,
+        'Nsec': np.mean(padded('Nsec'), axis=0),
+        'meanS2': np.nanmean(padded('meanS2'), axis=0),
+        'binder': 1 - np.mean(Ngcc_values**4, axis=0) / (3*(np.mean(Ngcc_values**2, axis=0))**2)
+    }
+
+def binomialLogWeights(N, f, n):
+    """ (int, float, np.array) -> np.array
+
+    log of the binomial probability of n removed nodes out of N when
+    each one is removed with probability f. Computed with log-gamma
+    functions, so it stays accurate for N of order 10^6 and more, and
+    f = 0 or 1 are handled.
+
+    >>> np.exp(binomialLogWeights(4, 0.5, np.arange(5))).round(12).tolist()
+    [0.0625, 0.25, 0.375, 0.25, 0.0625]
+    """
+
+    n = np.asarray(n, dtype=np.float64)
+    return (gammaln(N+1) - gammaln(n+1) - gammaln(N-n+1) +
+            xlogy(n, f) + xlog1py(N-n, -f))
+
+def canonicalCurve(values, f_values, N=None, width=10., end=0.):
+    """ (np.array, list, int, float, float) -> np.array
+
+    Canonical (fixed removal probability f) version of the
+    microcanonical curve 'values', whose last axis holds the observable
+    with n = 0, 1, ... removed nodes, as in the percolation outputs:
+
+        Q(f) = sum_n C(N, n) f^n (1-f)^(N-n) Q_n
+
+    The percolation outputs hold n = 0, ..., N-1 and stop before the
+    last node is removed, so N defaults to len(values) along the last
+    axis and Q_N, the empty graph, is taken as 'end' (0, as for Ngcc
+    and Nsec; use NaN for mean sizes). Only the window of n within
+    'width' standard deviations of N f is summed, so each f costs
+    O(sqrt(N f (1-f))) instead of O(N), and the weights are normalized
+    on it. Entries missing (n beyond the curve) or NaN are skipped and
+    the remaining weights normalized again, so the result is NaN only
+    where no step in the window is defined. Returns an array with the
+    leading shape of 'values' and one entry per f on the last axis.
+
+    >>> ring = np.array([(i, (i+1) % 10) for i in range(10)])
+    >>> Ngcc = percolateEdges(10, ring, np.arange(10))['Ngcc']
+    >>> Ngcc.tolist()
+    [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+    >>> canonicalCurve(Ngcc, [0., 0.5, 1.]).round(12).tolist()
+    [10.0, 5.0, 0.0]
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    T = values.shape[-1]
+    if N is None:
+        N = T
+    if T <= N:
+        ## Entries up to n = N, with the empty graph at n = N
+        padded = np.full(values.shape[:-1] + (N + 1,), np.nan)
+        padded[..., :T] = values
+        padded[..., N] = end
+        values = padded
+        T = N + 1
+    result = np.full(values.shape[:-1] + (len(f_values),), np.nan)
+    for i, f in enumerate(f_values):
+        mu = N*f
+        half = width*np.sqrt(N*f*(1-f)) + 1
+        n = np.arange(max(0, int(np.floor(mu - half))),
+                      min(T - 1, N, int(np.ceil(mu + half))) + 1)
+        if not len(n):
+            continue
+        log_w = binomialLogWeights(N, f, n)
+        w = np.exp(log_w - log_w.max())
+        window = values[..., n]
+        valid = ~np.isnan(window)
+        norm = (w*valid).sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[..., i] = np.where(valid, w*window, 0.).sum(axis=-1) / norm
+    return result
+
+def canonicalPercolation(data, f_values, N=None, width=10.):
+    """ (dict, list, int, float) -> dict
+
+    Canonical curves at removal probabilities 'f_values' from the
+    output of percolateEdges (a single order) or randomPercolation
+    (moments over orders), in the way of Newman and Ziff.
+
+    For a single order each of 'Ngcc', 'Nsec', 'meanS' and 'meanS2'
+    is convolved directly. For randomPercolation the raw moments
+    <X^k> are convolved, and the mean, variance and Binder cumulant
+    1 - <X^4> / (3 <X^2>^2) of each observable are formed afterwards
+    (the cumulant needs n_moments >= 4). N is the number of nodes
+    (defaults to the curve length), since the curves stop before the
+    last node is removed; the empty graph has Ngcc = Nsec = 0 and
+    undefined mean sizes, see canonicalCurve.
+    """
+
+    keys = ['Ngcc', 'Nsec', 'meanS', 'meanS2']
+    canonical = {'f': np.asarray(f_values, dtype=np.float64)}
+    for key in keys:
+        ## Sizes of the empty graph: no component, no mean size
+        end = 0. if key in ['Ngcc', 'Nsec'] else np.nan
+        if not isinstance(data[key], dict):
+            canonical[key] = canonicalCurve(data[key], f_values, N, width, end)
+            continue
+        moments = canonicalCurve(data[key]['moments'], f_values, N, width, end)
+        canonical[key] = {
+            'mean': moments[0],
+            'var': moments[1] - moments[0]**2,
+            'moments': moments
+        }
+        if len(moments) >= 4:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                canonical[key]['binder'] = 1 - moments[3] / (3*moments[1]**2)
+    return canonical
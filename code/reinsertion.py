@@ -0,0 +1,182 @@
+import os
+import heapq
+import numpy as np
+
+from percolation import getEdgeArray, buildCSR, findRoot, percolateEdges
+
+
+def _dismantlingSize(N, edges, oi_list, max_size):
+    """ Length of the shortest prefix of 'oi_list' leaving no component
+    larger than 'max_size' (len(oi_list) if none does).
+    """
+
+    Ngcc = percolateEdges(N, edges, oi_list)['Ngcc']
+    below = np.flatnonzero(Ngcc <= max_size)
+    return int(below[0]) if len(below) else len(oi_list)
+
+def reinsertion(N, edges, oi_list, threshold=0.01, criterion='size'):
+    """ (int, np.array, list, float, str) -> dict
+
+    Greedy reinsertion of a dismantling order. The shortest prefix of
+    'oi_list' that leaves no component larger than threshold*N nodes
+    (at least 1) is the dismantling set. Its nodes are put back one at
+    a time, always the one with the lowest cost, as long as no
+    component grows beyond that size:
+
+        'size':     size of the cluster the node would create.
+        'clusters': number of distinct clusters it would join.
+
+    Ties go to the smallest node. Clusters are kept in a union-find
+    with sizes at the roots and candidates in a lazy priority queue: a
+    popped node whose cost changed is pushed back with the new one, so
+    each evaluation costs O(deg alpha(N)). Cluster sizes only grow, so
+    the 'size' queue is exact. The number of clusters joined can also
+    drop when two of them merge, which the lazy queue only notices
+    when the node is popped again.
+
+    Returns a dict with:
+        'oi_list':  improved order: the nodes left in the dismantling
+                    set (in their original order), the reinserted ones
+                    in reverse order of reinsertion, then the rest of
+                    'oi_list'.
+        'n_dismantle': size of the reduced dismantling set.
+        'n_original': size of the original one.
+        plus the percolateEdges observables of the improved order.
+
+    >>> edges = np.array([(0, 1), (1, 2), (2, 3), (3, 4), (0, 5)])
+    >>> data = reinsertion(6, edges, [0, 1, 2, 3, 4, 5], threshold=0.5)
+    >>> data['n_original'], data['n_dismantle'], data['oi_list'].tolist()
+    (2, 1, [1, 0, 2, 3, 4, 5])
+    """
+
+    oi_list = np.asarray(oi_list, dtype=np.int64)
+    if criterion not in ['size', 'clusters']:
+        raise ValueError('Unknown reinsertion criterion "{}"'.format(criterion))
+    max_size = max(1, int(threshold*N))
+    k = _dismantlingSize(N, edges, oi_list, max_size)
+    dismantling = oi_list[:k].tolist()
+
+    indptr, indices = buildCSR(N, edges)
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+
+    EMPTY = -N-1
+    ptr = [-1]*N
+    for v in dismantling:
+        ptr[v] = EMPTY
+    present = [v for v in range(N) if ptr[v] != EMPTY]
+    for s1 in present:
+        r1 = findRoot(ptr, s1)
+        for s2 in indices[indptr[s1]:indptr[s1+1]]:
+            if ptr[s2] == EMPTY:
+                continue
+            r2 = findRoot(ptr, s2)
+            if r2 == r1:
+                continue
+            if ptr[r1] > ptr[r2]:
+                r1, r2 = r2, r1
+            ptr[r1] += ptr[r2]
+            ptr[r2] = r1
+
+    def cost(v):
+        """ (cost, size of the merged cluster) of reinserting v. """
+        roots = set()
+        for w in indices[indptr[v]:indptr[v+1]]:
+            if ptr[w] != EMPTY:
+                roots.add(findRoot(ptr, w))
+        size = 1 - sum(ptr[r] for r in roots)
+        return (size if criterion == 'size' else len(roots)), size
+
+    heap = [(cost(v)[0], v) for v in dismantling]
+    heapq.heapify(heap)
+    reinserted = []
+    while heap:
+        key, v = heapq.heappop(heap)
+        new_key, size = cost(v)
+        if size > max_size:
+            ## Clusters only grow, so v can never be put back
+            continue
+        if new_key != key:
+            heapq.heappush(heap, (new_key, v))
+            continue
+        ptr[v] = -1
+        for w in indices[indptr[v]:indptr[v+1]]:
+            if ptr[w] == EMPTY:
+                continue
+            r1 = findRoot(ptr, v)
+            r2 = findRoot(ptr, w)
+            if r1 == r2:
+                continue
+            if ptr[r1] > ptr[r2]:
+                r1, r2 = r2, r1
+            ptr[r1] += ptr[r2]
+            ptr[r2] = r1
+        reinserted.append(v)
+
+    is_reinserted = np.zeros(N, dtype=bool)
+    is_reinserted[reinserted] = True
+    kept = [v for v in dismantling if not is_reinserted[v]]
+    order = np.array(kept + reinserted[::-1], dtype=np.int64)
+    order = np.concatenate((order, oi_list[k:]))
+
+    data = percolateEdges(N, edges, order)
+    data['oi_list'] = order
+    data['n_dismantle'] = len(kept)
+    data['n_original'] = k
+    return data
+
+def reinsertionAttack(graph, data_dir, net_name, attack, threshold=0.01,
+                      criterion='size', overwrite=False):
+    """ (iGraph.Graph(), str, str, str, float, str, bool) -> dict
+
+    Applies reinsertion to the order in '<attack>/oi_list_<net_name>.txt'
+    of 'data_dir' (e.g. 'BtwU' or 'DegU') on the giant component of
+    'graph', preprocessed as the attacks do. The improved order is
+    written to '<attack>R/oi_list_<net_name>.txt' and its observables
+    to '<attack>R/comp_data_<net_name>.txt', with the columns of
+    get_components.py. Returns the reinsertion data.
+    """
+
+    oi_file = os.path.join(data_dir, attack, 'oi_list_' + net_name + '.txt')
+    if not os.path.isfile(oi_file):
+        print('FILE ' + oi_file + ' NOT FOUND')
+        return None
+
+    output_dir = os.path.join(data_dir, attack + 'R')
+    if not os.path.exists(output_dir):
+        os.mkdir(output_dir)
+    output_file = os.path.join(output_dir, 'oi_list_' + net_name + '.txt')
+    if os.path.isfile(output_file):
+        if overwrite:
+            print('Removing file "' + output_file)
+            os.remove(output_file)
+        else:
+            return None
+
+    ## Create a copy of graph so as not to modify the original
+    g = graph.copy()
+
+    if not g.is_simple():
+        print('Network "' + net_name + '" will be considered as simple.')
+        g.simplify()
+
+    if g.is_directed():
+        print('Network "' + net_name + '" will be considered as undirected.')
+        g.to_undirected()
+
+    if not g.is_connected():
+        print('Only giant component of network "' + net_name + '" will be considered.')
+        components = g.components(mode='weak')
+        g = components.giant()
+
+    N, edges = getEdgeArray(g)
+    oi_list = np.loadtxt(oi_file, dtype=int, ndmin=1)
+    data = reinsertion(N, edges, oi_list, threshold, criterion)
+    print('Dismantling set of "{}" reduced from {} to {} nodes'.format(
+          net_name, data['n_original'], data['n_dismantle']))
+
+    np.savetxt(output_file, data['oi_list'], fmt='%d')
+    comp_data = np.array([data['Ngcc'], data['Nsec'], data['meanS'], data['meanS2']]).T
+    np.savetxt(os.path.join(output_dir, 'comp_data_' + net_name + '.txt'),
+               comp_data, fmt='%d %d %f %f')
+    return data
@@ -0,0 +1,132 @@
+import os
+import numpy as np
+
+
+STATIC_PREFIXES = {
+    'degree': 'Deg',
+    'betweenness': 'Btw',
+    'closeness': 'Clo',
+    'harmonic': 'Harm',
+    'coreness': 'Core',
+    'eigenvector': 'Eig',
+    'random': 'Ran'
+}
+
+def rankingOrder(values, secondary=None, decimals=9):
+    """ (np.array, np.array, int) -> np.array
+
+    Nodes by decreasing 'values', ties to the larger 'secondary' value
+    (if given) and then to the smallest index. Floating point values
+    are compared after rounding to 'decimals' digits relative to the
+    largest one, so ties do not depend on the summation order of the
+    kernel that computed them.
+
+    >>> rankingOrder(np.array([1., 3., 1., 3.])).tolist()
+    [1, 3, 0, 2]
+    >>> rankingOrder(np.array([2, 2, 1]), secondary=np.array([1, 5, 9])).tolist()
+    [1, 0, 2]
+    """
+
+    values = np.asarray(values)
+    if values.dtype.kind == 'f' and len(values):
+        scale = np.abs(values).max()
+        if scale > 0:
+            values = np.round(values / scale, decimals)
+    keys = [np.arange(len(values))]
+    if secondary is not None:
+        keys.append(-np.asarray(secondary))
+    keys.append(-values)
+    return np.lexsort(keys)
+
+def staticCentralities(g, centralities):
+    """ (iGraph.Graph(), list) -> dict
+
+    Values of the requested 'centralities' (any of 'degree',
+    'betweenness', 'closeness', 'harmonic', 'coreness', 'eigenvector')
+    for every node of the undirected graph 'g'. Betweenness, closeness
+    and harmonic centrality are one igraph call each, which is faster
+    than a BFS shared by the three (ER, N=8000: 14 s against 25 s).
+    """
+
+    data = {}
+    if 'betweenness' in centralities:
+        data['betweenness'] = np.array(g.betweenness(directed=False))
+    if 'closeness' in centralities:
+        data['closeness'] = np.array(g.closeness())
+    if 'harmonic' in centralities:
+        data['harmonic'] = np.array(g.harmonic_centrality())
+    if 'degree' in centralities or 'coreness' in centralities:
+        data['degree'] = np.array(g.degree())
+    if 'coreness' in centralities:
+        data['coreness'] = np.array(g.coreness())
+    if 'eigenvector' in centralities:
+        data['eigenvector'] = np.array(g.eigenvector_centrality())
+    return data
+
+def staticAttacks(graph, data_dir, net_name, centralities, overwrite=False):
+    """ (iGraph.Graph(), str, str, list, bool) -> dict
+
+    Non-adaptive attacks for all the 'centralities' in one call. The
+    graph is preprocessed once, as the other attacks do, the requested
+    centralities are computed together by staticCentralities and every
+    order is written to '<prefix>/oi_list_<net_name>.txt' of 'data_dir'
+    (Deg, Btw, Clo, Harm, Core, Eig or Ran, see STATIC_PREFIXES).
+
+    Orders come from rankingOrder: decreasing centrality, ties to the
+    smallest index, except for coreness, where they go to the larger
+    degree first as in CoreU. 'random' is a random permutation.
+    Existing files are kept unless 'overwrite'. Returns a dict with the
+    order of every attack that was written.
+    """
+
+    for c in centralities:
+        if c not in STATIC_PREFIXES:
+            print('ERROR: centrality "', c, '" is not supported')
+            return None
+
+    output_files = {}
+    for c in centralities:
+        output_dir = os.path.join(data_dir, STATIC_PREFIXES[c])
+        if not os.path.exists(output_dir):
+            os.mkdir(output_dir)
+        output_file = os.path.join(output_dir, 'oi_list_' + net_name + '.txt')
+        if os.path.isfile(output_file):
+            if not overwrite:
+                continue
+            print('Removing file "' + output_file)
+            os.remove(output_file)
+        output_files[c] = output_file
+    if not output_files:
+        return {}
+
+    ## Create a copy of graph so as not to modify the original
+    g = graph.copy()
+
+    if not g.is_simple():
+        print('Network "' + net_name + '" will be considered as simple.')
+        g.simplify()
+
+    if g.is_directed():
+        print('Network "' + net_name + '" will be considered as undirected.')
+        g.to_undirected()
+
+    if not g.is_connected():
+        print('Only giant component of network "' + net_name + '" will be considered.')
+        components = g.components(mode='weak')
+        g = components.giant()
+
+    values = staticCentralities(g, list(output_files))
+
+    orders = {}
+    for c, output_file in output_files.items():
+        if c == 'random':
+            order = np.arange(g.vcount())
+            np.random.shuffle(order)
+        elif c == 'coreness':
+            order = rankingOrder(values['coreness'], secondary=values['degree'])
+        else:
+            order = rankingOrder(values[c])
+        np.savetxt(output_file, order, fmt='%d')
+        orders[c] = order
+
+    return orders